@@ -0,0 +1,47 @@
+"""Measures loading a catalog split into shards, serially and in parallel.
+
+Snapshots are disabled so every run parses every shard. With more than
+one worker the shards are parsed by a process pool, so the parallel load
+time should shrink with the number of cores.
+
+Run from the repository root:
+    python -m benchmarks.ingest_benchmark [num_videos] [num_shards]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_catalog import write_catalog
+from src.video_library import VideoLibrary
+
+NUM_VIDEOS = 1_000_000
+NUM_SHARDS = 16
+
+
+def bench_load(pattern, workers):
+    """Returns the seconds taken to load every shard matching pattern."""
+    start = time.perf_counter()
+    VideoLibrary(pattern, snapshot=False, workers=workers)
+    return time.perf_counter() - start
+
+
+def main(num_videos=NUM_VIDEOS, num_shards=NUM_SHARDS):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shard_size = num_videos // num_shards
+        for shard in range(num_shards):
+            path = os.path.join(tmp_dir, f"videos_{shard:04d}.txt")
+            write_catalog(path, shard_size, first=shard * shard_size)
+
+        pattern = os.path.join(tmp_dir, "videos_*.txt")
+        cores = os.cpu_count()
+        print(f"{shard_size * num_shards} videos in {num_shards} shards, "
+              f"{cores} cores")
+        for workers in sorted({1, cores}):
+            elapsed = bench_load(pattern, workers)
+            print(f"{workers:>3} workers: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
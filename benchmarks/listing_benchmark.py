@@ -0,0 +1,59 @@
+"""Measures SHOW_ALL_VIDEOS and SHOW_PLAYLIST on a large catalog.
+
+Output goes to a NullSink, so only the work of building the listing is
+timed. The first run of each command builds the display lines; later
+runs reuse them.
+
+Run from the repository root:
+    python -m benchmarks.listing_benchmark [num_videos] [playlist_size]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_catalog import write_catalog
+from src.output_sink import NullSink
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+NUM_VIDEOS = 200_000
+PLAYLIST_SIZE = 50_000
+ROUNDS = 5
+
+
+def _time(command, rounds):
+    """Returns the seconds of the first call and the mean of the rest."""
+    start = time.perf_counter()
+    command()
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        command()
+    return first, (time.perf_counter() - start) / rounds
+
+
+def main(num_videos=NUM_VIDEOS, playlist_size=PLAYLIST_SIZE, rounds=ROUNDS):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "videos.txt")
+        write_catalog(path, num_videos)
+        player = VideoPlayer(VideoLibrary(path, snapshot=False),
+                             output=NullSink())
+
+    player.create_playlist("benchmark")
+    for i in range(playlist_size):
+        player.add_to_playlist("benchmark", f"video_{i:08d}_id")
+
+    print(f"{num_videos} videos, playlist of {playlist_size}")
+    print(f"{'command':>16} {'first (s)':>10} {'repeat (s)':>11}")
+    commands = (("SHOW_ALL_VIDEOS", player.show_all_videos),
+                ("SHOW_PLAYLIST", lambda: player.show_playlist("benchmark")))
+    for name, command in commands:
+        first, repeat = _time(command, rounds)
+        print(f"{name:>16} {first:>10.3f} {repeat:>11.3f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
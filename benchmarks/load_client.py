@@ -0,0 +1,96 @@
+"""A load generator for the simulator server.
+
+Opens many connections to a running server (python -m src.server) and
+has each one send a mix of commands as fast as the responses arrive,
+then reports throughput and response latency percentiles. The server
+handles every connection on one event loop, so it runs on a single
+core: the number of connections it sustains at an acceptable p99 is its
+connections per core.
+
+Run from the repository root:
+    python -m benchmarks.load_client --connections 200 --commands 500
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+PROMPT = b"YT> "
+
+# Commands each connection cycles through; {n} is the connection number.
+COMMAND_MIX = (
+    "NUMBER_OF_VIDEOS",
+    "PLAY amazing_cats_video_id",
+    "PAUSE",
+    "SHOW_PLAYING",
+    "CONTINUE",
+    "CREATE_PLAYLIST playlist_{n}",
+    "ADD_TO_PLAYLIST playlist_{n} funny_dogs_video_id",
+    "SHOW_PLAYLIST playlist_{n}",
+    "SEARCH_VIDEOS cat",
+    "SEARCH_VIDEOS_WITH_TAG #animal",
+    "DELETE_PLAYLIST playlist_{n}",
+    "STOP",
+)
+
+
+async def run_connection(host, port, number, num_commands, latencies):
+    """Sends num_commands commands over one connection.
+
+    Appends the seconds each response took to latencies.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readuntil(PROMPT)
+
+    commands = itertools.cycle(COMMAND_MIX)
+    for _ in range(num_commands):
+        command = next(commands).format(n=number)
+        start = time.perf_counter()
+        writer.write(command.encode() + b"\n")
+        await reader.readuntil(PROMPT)
+        latencies.append(time.perf_counter() - start)
+
+    writer.write(b"EXIT\n")
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+
+
+def percentile(sorted_values, fraction):
+    """Returns the value below which a fraction of sorted_values lies."""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_load(host, port, connections, num_commands):
+    """Runs every connection at once and returns the sorted latencies."""
+    latencies = []
+    await asyncio.gather(*(
+        run_connection(host, port, number, num_commands, latencies)
+        for number in range(connections)))
+    return sorted(latencies)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--connections", type=int, default=100)
+    arg_parser.add_argument("--commands", type=int, default=200,
+                            help="commands sent by each connection")
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    latencies = asyncio.run(run_load(args.host, args.port, args.connections,
+                                     args.commands))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.connections} connections, {len(latencies)} commands "
+          f"in {elapsed:.2f} s ({len(latencies) / elapsed:.0f} commands/s)")
+    print(f"latency p50 {percentile(latencies, 0.50) * 1e3:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
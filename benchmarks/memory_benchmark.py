@@ -0,0 +1,46 @@
+"""Measures the memory a loaded VideoLibrary uses per video.
+
+Run from the repository root:
+    python -m benchmarks.memory_benchmark [num_videos]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic_catalog import write_catalog
+from src.video_library import VideoLibrary
+
+NUM_VIDEOS = 200_000
+
+
+def bytes_per_video(path, num_videos):
+    """Returns the bytes allocated per video by loading the library.
+
+    Returns:
+        A (total, catalog) tuple. The catalog figure leaves out the search
+        indexes and orderings, which are dropped before measuring it.
+    """
+    tracemalloc.start()
+    library = VideoLibrary(path, snapshot=False)
+    total, _ = tracemalloc.get_traced_memory()
+    library._title_index = library._tag_index = None
+    library._sorted_titles = library._sorted_ids = None
+    catalog, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del library
+    return total / num_videos, catalog / num_videos
+
+
+def main(num_videos=NUM_VIDEOS):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "videos.txt")
+        write_catalog(path, num_videos)
+        total, catalog = bytes_per_video(path, num_videos)
+        print(f"{num_videos} videos: {total:.0f} bytes per video in total, "
+              f"{catalog:.0f} for the catalog itself")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
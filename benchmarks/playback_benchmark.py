@@ -0,0 +1,59 @@
+"""Measures PAUSE/CONTINUE and PLAY_RANDOM latency for growing catalogs.
+
+Run from the repository root:
+    python -m benchmarks.playback_benchmark
+"""
+
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_catalog import write_catalog
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+SIZES = (10, 1_000, 100_000, 1_000_000)
+ROUNDS = 10_000
+
+
+def bench_playback(num_videos, rounds=ROUNDS):
+    """Returns the mean seconds per PAUSE+CONTINUE pair and per PLAY_RANDOM.
+
+    Random picks use a seeded generator, so every run plays the same
+    videos.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "videos.txt")
+        write_catalog(path, num_videos)
+        player = VideoPlayer(VideoLibrary(path), rng=random.Random(0))
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        player.play_video("video_00000000_id")
+        start = time.perf_counter()
+        for _ in range(rounds):
+            player.pause_video()
+            player.continue_video()
+        per_pair = (time.perf_counter() - start) / rounds
+
+        # The first pick gathers the unflagged videos; time the rest.
+        player.play_random_video()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            player.play_random_video()
+        per_random = (time.perf_counter() - start) / rounds
+
+    return per_pair, per_random
+
+
+def main(sizes=SIZES):
+    print(f"{'videos':>10} {'pause+continue (us)':>22} {'play_random (us)':>18}")
+    for num_videos in sizes:
+        per_pair, per_random = bench_playback(num_videos)
+        print(f"{num_videos:>10} {per_pair * 1e6:>22.2f} {per_random * 1e6:>18.2f}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or SIZES)
@@ -0,0 +1,75 @@
+"""Measures VideoLibrary startup time and memory for each loading path.
+
+Run from the repository root:
+    python -m benchmarks.startup_benchmark [num_videos]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic_catalog import write_catalog
+from src.catalog_loader import load_snapshot, parse_catalog, write_snapshot
+from src.video_library import VideoLibrary
+
+NUM_VIDEOS = 1_000_000
+
+
+def bench_startup(path, **library_options):
+    """Returns (seconds, bytes allocated) to load the library at path.
+
+    Time and memory are measured on separate loads, since tracing
+    allocations slows the load down considerably.
+    """
+    start = time.perf_counter()
+    VideoLibrary(path, **library_options)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    library = VideoLibrary(path, **library_options)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del library
+    return elapsed, allocated
+
+
+def bench_catalog_read(path):
+    """Returns (parse seconds, snapshot load seconds) for the raw catalog.
+
+    This leaves out building Video objects and the search indexes, which
+    both startup paths share.
+    """
+    start = time.perf_counter()
+    catalog = parse_catalog(path)
+    parse_elapsed = time.perf_counter() - start
+
+    write_snapshot(path, catalog)
+    start = time.perf_counter()
+    load_snapshot(path)
+    snapshot_elapsed = time.perf_counter() - start
+    return parse_elapsed, snapshot_elapsed
+
+
+def main(num_videos=NUM_VIDEOS):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "videos.txt")
+        write_catalog(path, num_videos)
+
+        print(f"{num_videos} videos")
+        parse_elapsed, snapshot_elapsed = bench_catalog_read(path)
+        print(f"catalog read: parse {parse_elapsed:.2f} s, "
+              f"snapshot {snapshot_elapsed:.2f} s")
+
+        print(f"{'loader':>10} {'startup (s)':>12} {'memory (MB)':>12}")
+        loaders = (("parse", {"snapshot": False}),
+                   ("snapshot", {}),
+                   ("lazy", {"lazy": True}))
+        for name, options in loaders:
+            elapsed, allocated = bench_startup(path, **options)
+            print(f"{name:>10} {elapsed:>12.2f} {allocated / 2 ** 20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,43 @@
+"""Measures "did you mean" suggestions for mistyped video ids.
+
+Builds the symmetric-delete index over num_videos synthetic ids, then
+times lookups of ids with one typo and of ids nothing is close to.
+
+Run from the repository root:
+    python -m benchmarks.suggestion_benchmark [num_videos]
+"""
+
+import random
+import sys
+import time
+
+from src.fuzzy_index import FuzzyIndex
+
+NUM_VIDEOS = 1_000_000
+NUM_LOOKUPS = 10_000
+
+
+def main(num_videos=NUM_VIDEOS):
+    video_ids = [f"video_{i:08d}_id" for i in range(num_videos)]
+
+    start = time.perf_counter()
+    index = FuzzyIndex(video_ids)
+    print(f"{num_videos} ids indexed in {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(0)
+    typos = []
+    for video_id in rng.sample(video_ids, NUM_LOOKUPS):
+        i = rng.randrange(len(video_id))
+        typos.append(video_id[:i] + "x" + video_id[i + 1:])
+    unknown = [f"unknown_{i}_video" for i in range(NUM_LOOKUPS)]
+
+    for name, queries in (("one typo", typos), ("no match", unknown)):
+        start = time.perf_counter()
+        for query in queries:
+            index.lookup(query)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>9}: {elapsed / len(queries) * 1e6:.1f} us per lookup")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,16 @@
+"""Helpers to generate synthetic video catalogs for the benchmarks."""
+
+_TAGS = ("#cat", "#dog", "#animal", "#google", "#career", "#music", "#news")
+
+
+def write_catalog(path, num_videos, first=0):
+    """Writes a pipe-delimited catalog with num_videos rows to path.
+
+    Rows follow the videos.txt format: "title | video_id | tag , tag".
+    Videos are numbered from first, so catalogs written with different
+    ranges can be loaded together without repeating ids.
+    """
+    with open(path, "w") as catalog:
+        for i in range(first, first + num_videos):
+            tags = " , ".join((_TAGS[i % len(_TAGS)], _TAGS[(i // 7) % len(_TAGS)]))
+            catalog.write(f"Video number {i} | video_{i:08d}_id | {tags}\n")
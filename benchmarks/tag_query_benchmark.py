@@ -0,0 +1,49 @@
+"""Measures boolean tag queries evaluated on bitsets.
+
+Builds the tag bitsets over num_videos synthetic videos, tagged as in
+the synthetic catalogs with every tenth video flagged, then times
+compound queries, listing every match and only the first 20. Bitsets
+are NumPy arrays when NumPy is installed and Python ints otherwise.
+
+Run from the repository root:
+    python -m benchmarks.tag_query_benchmark [num_videos]
+"""
+
+import sys
+import time
+
+from src import tag_bitsets
+from src.tag_bitsets import TagBitsets
+
+NUM_VIDEOS = 10_000_000
+NUM_RUNS = 5
+QUERIES = (
+    "#cat AND #animal NOT #dog",
+    "(#cat OR #dog) AND NOT #news",
+    "#google #career",
+)
+_TAGS = ("#cat", "#dog", "#animal", "#google", "#career", "#music", "#news")
+
+
+def main(num_videos=NUM_VIDEOS):
+    video_ids = [f"video_{i:08d}_id" for i in range(num_videos)]
+    tagged = ((i, (i % len(_TAGS), (i // 7) % len(_TAGS)), i % 10 == 0)
+              for i in range(num_videos))
+
+    start = time.perf_counter()
+    bitsets = TagBitsets(video_ids, _TAGS, tagged)
+    backend = "numpy" if tag_bitsets.np is not None else "int"
+    print(f"{num_videos} videos indexed in {time.perf_counter() - start:.2f} s"
+          f" ({backend} bitsets)")
+
+    for query in QUERIES:
+        for limit in (None, 20):
+            start = time.perf_counter()
+            for _ in range(NUM_RUNS):
+                found = bitsets.query(query, limit)
+            elapsed = (time.perf_counter() - start) / NUM_RUNS
+            print(f"{query}: {len(found)} videos in {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,331 @@
+"""Loaders for the pipe-delimited video catalog."""
+
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from .video import VideoColumns
+from bisect import bisect_right
+from pathlib import Path
+import csv
+import glob
+import marshal
+import mmap
+import os
+import struct
+import threading
+
+# Snapshots start with a magic string, the snapshot format version, the
+# marshal version and the size and mtime of the catalog they were made from.
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_VERSION = 3
+_SNAPSHOT_HEADER = struct.Struct("<4sHHQq")
+_SNAPSHOT_MAGIC = b"YTVS"
+
+
+def parse_video_row(video_info):
+    """Returns the (title, video_id, tags) of one split catalog row.
+
+    Args:
+        video_info: The three pipe-separated fields of a catalog row.
+    """
+    title, url, tags = (item.strip() for item in video_info)
+    return title, url, [tag.strip() for tag in tags.split(",")] if tags else []
+
+
+def parse_catalog(video_file):
+    """Parses a pipe-delimited catalog.
+
+    Returns:
+        A VideoColumns object holding one row per line, in file order.
+    """
+    columns = VideoColumns()
+    with open(video_file) as catalog:
+        for video_info in csv.reader(catalog, delimiter="|"):
+            columns.append(*parse_video_row(video_info))
+    return columns
+
+
+def resolve_sources(sources):
+    """Expands catalog sources into the list of catalog files to load.
+
+    Args:
+        sources: A path or glob pattern, or an iterable of them. Patterns
+            expand to their matches in sorted order.
+
+    Returns:
+        The catalog paths in the order given, each listed once.
+
+    Raises:
+        FileNotFoundError: If a pattern matches no files.
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+
+    paths = {}
+    for source in sources:
+        source = os.fspath(source)
+        if not any(char in source for char in "*?["):
+            paths.setdefault(Path(source), None)
+            continue
+
+        matches = sorted(glob.glob(source))
+        if not matches:
+            raise FileNotFoundError(f"No catalog matches {source!r}")
+        for match in matches:
+            paths.setdefault(Path(match), None)
+    return list(paths)
+
+
+def _parse_for_merge(video_file, snapshot):
+    """Parses one catalog in a worker process.
+
+    Returns:
+        The parsed columns as returned by VideoColumns.to_snapshot, which
+        is cheap to send back to the parent process.
+    """
+    columns = parse_catalog(video_file)
+    if snapshot:
+        write_snapshot(video_file, columns)
+    return columns.to_snapshot()
+
+
+def load_catalogs(video_files, snapshot=True, workers=None):
+    """Loads several catalogs into one set of columns.
+
+    Catalogs with an up-to-date snapshot are loaded from it. When more than
+    one catalog needs parsing and more than one worker is allowed, they
+    are parsed in parallel by a pool of worker processes, one catalog per
+    task. The rows are merged in the
+    order of video_files, each catalog's rows in file order, so the result
+    does not depend on which worker finishes first.
+
+    Args:
+        video_files: Paths of the catalogs, as returned by resolve_sources.
+        snapshot: If True, use and write each catalog's snapshot.
+        workers: Number of worker processes. Defaults to the number of
+            processors.
+
+    Returns:
+        A VideoColumns object holding the rows of every catalog.
+    """
+    loaded = [load_snapshot(video_file) if snapshot else None
+              for video_file in video_files]
+    to_parse = [video_file for video_file, columns
+                in zip(video_files, loaded) if columns is None]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if len(to_parse) > 1 and workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            parsed = iter(executor.map(
+                _parse_for_merge, to_parse, [snapshot] * len(to_parse)))
+            loaded = [VideoColumns.from_snapshot(next(parsed))
+                      if columns is None else columns
+                      for columns in loaded]
+    else:
+        for i, video_file in enumerate(video_files):
+            if loaded[i] is None:
+                loaded[i] = parse_catalog(video_file)
+                if snapshot:
+                    write_snapshot(video_file, loaded[i])
+
+    if len(loaded) == 1:
+        return loaded[0]
+    merged = VideoColumns()
+    for columns in loaded:
+        merged.extend(columns)
+    return merged
+
+
+def snapshot_path(video_file):
+    """Returns the path of the snapshot kept next to a catalog."""
+    video_file = Path(video_file)
+    return video_file.with_name(video_file.name + SNAPSHOT_SUFFIX)
+
+
+def _snapshot_header(video_file):
+    """Returns the snapshot header matching the catalog as it is now."""
+    stat = os.stat(video_file)
+    return _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                 marshal.version, stat.st_size,
+                                 stat.st_mtime_ns)
+
+
+def write_snapshot(video_file, catalog):
+    """Writes the parsed catalog to a binary snapshot next to video_file.
+
+    The snapshot is written to a temporary file first and then renamed,
+    so readers never see a partial snapshot. Failing to write it (for
+    example in a read-only directory) is not an error.
+
+    Args:
+        video_file: Path of the catalog that was parsed.
+        catalog: The VideoColumns returned by parse_catalog.
+    """
+    path = snapshot_path(video_file)
+    temp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as snapshot:
+            snapshot.write(_snapshot_header(video_file))
+            snapshot.write(marshal.dumps(catalog.to_snapshot()))
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_snapshot(video_file):
+    """Loads the snapshot of a catalog if it is still up to date.
+
+    Returns:
+        The VideoColumns stored by write_snapshot, or None if there is no
+        snapshot, it is unreadable, or the size or mtime of video_file
+        changed since it was written.
+    """
+    try:
+        with open(snapshot_path(video_file), "rb") as snapshot:
+            header = snapshot.read(_SNAPSHOT_HEADER.size)
+            if header != _snapshot_header(video_file):
+                return None
+            return VideoColumns.from_snapshot(marshal.loads(snapshot.read()))
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+class LazyRows(MutableMapping):
+    """A class used to represent lazily parsed, memory-mapped catalogs.
+
+    Opening the catalogs only scans them for the video id of every row and
+    remembers the byte offset where the row starts. A row is parsed and
+    appended to the library's VideoColumns the first time it is looked up.
+    Quoted fields containing a '|' are not supported by the scan.
+
+    Behaves like a dict from video_id to row number in the columns, in
+    file order. A video_id found in more than one row keeps its first row.
+    Looking rows up is safe from many threads at once; changing the mapping
+    is not.
+    """
+
+    def __init__(self, video_files, columns):
+        """LazyRows constructor.
+
+        Args:
+            video_files: Path of the pipe-delimited catalog to map, or a
+                sequence of paths.
+            columns: The VideoColumns that parsed rows are appended to.
+        """
+        if isinstance(video_files, (str, os.PathLike)):
+            video_files = [video_files]
+
+        # The catalogs are addressed as if they were concatenated: a
+        # position is the catalog's start position plus the byte offset.
+        self._data = []
+        self._starts = []
+        self._columns = columns
+        # video_id -> position of its line, for unparsed rows.
+        self._offsets = {}
+        # video_id -> row in the columns, for parsed or assigned rows.
+        self._rows = {}
+        self._duplicates = set()
+        # Held while rows are parsed into the columns or their tags added
+        # to its tag dictionary.
+        self._parse_lock = threading.Lock()
+
+        end = 0
+        for video_file in video_files:
+            with open(video_file, "rb") as catalog:
+                if os.fstat(catalog.fileno()).st_size:
+                    data = mmap.mmap(
+                        catalog.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    data = b""
+            self._data.append(data)
+            self._starts.append(end)
+            self._scan(data, end)
+            end += len(data)
+
+    @property
+    def duplicate_video_ids(self) -> set:
+        """Returns the video ids found in more than one row."""
+        return self._duplicates
+
+    def _scan(self, data, base):
+        """Adds the video_id -> line position of every row of one catalog."""
+        offsets = self._offsets
+        duplicates = self._duplicates
+        end = len(data)
+        start = 0
+        while start < end:
+            line_end = data.find(b"\n", start)
+            if line_end == -1:
+                line_end = end
+
+            first_pipe = data.find(b"|", start, line_end)
+            if first_pipe != -1:
+                second_pipe = data.find(b"|", first_pipe + 1, line_end)
+                if second_pipe != -1:
+                    video_id = data[first_pipe + 1:second_pipe].strip().decode()
+                    if video_id in offsets:
+                        duplicates.add(video_id)
+                    else:
+                        offsets[video_id] = base + start
+
+            start = line_end + 1
+
+    def _parse_line(self, position):
+        """Returns the (title, video_id, tags) of the line at position."""
+        catalog = bisect_right(self._starts, position) - 1
+        data = self._data[catalog]
+        offset = position - self._starts[catalog]
+        line_end = data.find(b"\n", offset)
+        if line_end == -1:
+            line_end = len(data)
+        line = data[offset:line_end].decode()
+        return parse_video_row(next(csv.reader([line], delimiter="|")))
+
+    def rows(self):
+        """Yields (video_id, title, tag_ids) for every video.
+
+        Rows that were never looked up are read straight from the file
+        without adding them to the columns; only their tags are added to
+        the columns' tag dictionary.
+        """
+        columns = self._columns
+        tag_id = columns.tag_dictionary.tag_id
+        with self._parse_lock:
+            for video_id, offset in self._offsets.items():
+                row = self._rows.get(video_id)
+                if row is not None:
+                    yield video_id, columns.title(row), columns.tag_ids(row)
+                else:
+                    title, _, tags = self._parse_line(offset)
+                    yield video_id, title, [tag_id(tag) for tag in tags]
+
+    def __getitem__(self, video_id):
+        row = self._rows.get(video_id)
+        if row is None:
+            offset = self._offsets[video_id]
+            with self._parse_lock:
+                row = self._rows.get(video_id)
+                if row is None:
+                    row = self._columns.append(*self._parse_line(offset))
+                    self._rows[video_id] = row
+        return row
+
+    def __setitem__(self, video_id, row):
+        self._offsets[video_id] = None
+        self._rows[video_id] = row
+
+    def __delitem__(self, video_id):
+        del self._offsets[video_id]
+        self._rows.pop(video_id, None)
+
+    def __contains__(self, video_id):
+        return video_id in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
@@ -1,7 +1,8 @@
 """A command parser class."""
 
+from .rwlock import READ, WRITE
 import textwrap
-from typing import Sequence
+from typing import NamedTuple, Optional, Sequence, Tuple
 
 
 class CommandException(Exception):
@@ -9,14 +10,144 @@ class CommandException(Exception):
     pass
 
 
+class CommandSpec(NamedTuple):
+    """A class used to represent how a command is dispatched.
+
+    Attributes:
+        handler: Name of the method that runs the command, on the video
+            player unless on_parser is set.
+        arguments: Descriptions of the arguments the command requires.
+        optional: Descriptions of the arguments that may follow them.
+        on_parser: If True, handler is a method of the CommandParser.
+        rest: If True, the last required argument is every remaining word,
+            joined with single spaces; the handler picks any optional
+            arguments out of it.
+        library_access: How the command uses the shared VideoLibrary: READ,
+            WRITE or None.
+        session_access: How the command uses the player's own playback
+            state and playlists: READ, WRITE or None.
+    """
+    handler: str
+    arguments: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    on_parser: bool = False
+    rest: bool = False
+    library_access: Optional[str] = None
+    session_access: Optional[str] = None
+
+    @property
+    def takes_arguments(self) -> bool:
+        """Returns True if the command has any arguments."""
+        return bool(self.arguments or self.optional)
+
+    def accepts(self, num_arguments: int) -> bool:
+        """Returns True if the command can be given num_arguments."""
+        if not self.takes_arguments:
+            # Commands without arguments ignore anything typed after them.
+            return True
+        if self.rest:
+            return len(self.arguments) <= num_arguments
+        return (len(self.arguments) <= num_arguments
+                <= len(self.arguments) + len(self.optional))
+
+    def usage(self, name: str) -> str:
+        """Returns the message shown when the command is misused."""
+        expected = list(self.arguments)
+        expected.extend("an optional " + optional for optional in self.optional)
+        return ("Please enter " + name + " command followed by "
+                + " and ".join(expected) + ".")
+
+
+# Every command the parser understands, keyed by its upper case name.
+# Searches take the session for writing because answering their question
+# plays a video.
+COMMANDS = {
+    "NUMBER_OF_VIDEOS": CommandSpec(
+        "number_of_videos", library_access=READ),
+    "SHOW_ALL_VIDEOS": CommandSpec("show_all_videos", library_access=READ),
+    "PLAY": CommandSpec(
+        "play_video", ("video_id",),
+        library_access=READ, session_access=WRITE),
+    "PLAY_RANDOM": CommandSpec(
+        "play_random_video", library_access=READ, session_access=WRITE),
+    "STOP": CommandSpec("stop_video", session_access=WRITE),
+    "PAUSE": CommandSpec("pause_video", session_access=WRITE),
+    "CONTINUE": CommandSpec("continue_video", session_access=WRITE),
+    "SHOW_PLAYING": CommandSpec("show_playing", session_access=READ),
+    "CREATE_PLAYLIST": CommandSpec(
+        "create_playlist", ("a playlist name",), session_access=WRITE),
+    "ADD_TO_PLAYLIST": CommandSpec(
+        "add_to_playlist", ("a playlist name", "video_id to add"),
+        library_access=READ, session_access=WRITE),
+    "REMOVE_FROM_PLAYLIST": CommandSpec(
+        "remove_from_playlist", ("a playlist name", "video_id to remove"),
+        library_access=READ, session_access=WRITE),
+    "CLEAR_PLAYLIST": CommandSpec(
+        "clear_playlist", ("a playlist name",), session_access=WRITE),
+    "DELETE_PLAYLIST": CommandSpec(
+        "delete_playlist", ("a playlist name",), session_access=WRITE),
+    "SHOW_PLAYLIST": CommandSpec(
+        "show_playlist", ("a playlist name",),
+        library_access=READ, session_access=READ),
+    "SHOW_ALL_PLAYLISTS": CommandSpec(
+        "show_all_playlists", session_access=READ),
+    "SEARCH_VIDEOS": CommandSpec(
+        "_search_videos", ("a search term",), ("result limit",),
+        on_parser=True, library_access=READ, session_access=WRITE),
+    "SEARCH_VIDEOS_WITH_TAG": CommandSpec(
+        "_search_videos_tag", ("a video tag",), ("EXACT", "result limit"),
+        on_parser=True, library_access=READ, session_access=WRITE),
+    "SEARCH_VIDEOS_WITH_TAGS": CommandSpec(
+        "search_videos_tag_query", ("a tag query",), rest=True,
+        library_access=READ, session_access=WRITE),
+    "SEARCH_VIDEOS_RANKED": CommandSpec(
+        "_search_videos_ranked", ("search words",), ("result limit",),
+        on_parser=True, rest=True, library_access=READ, session_access=WRITE),
+    "FLAG_VIDEO": CommandSpec(
+        "flag_video", ("a video_id",), ("flag reason",),
+        library_access=WRITE, session_access=WRITE),
+    "ALLOW_VIDEO": CommandSpec(
+        "allow_video", ("a video_id",), library_access=WRITE),
+    "SHOW_SEARCH_CACHE": CommandSpec(
+        "show_search_cache", library_access=READ),
+    "COMPLETE": CommandSpec(
+        "_complete", ("a prefix",), ("result limit",), on_parser=True,
+        library_access=READ, session_access=READ),
+    "HELP": CommandSpec("_get_help", on_parser=True),
+}
+
+
 class CommandParser:
-    """A class used to parse and execute a user Command."""
+    """A class used to parse and execute a user Command.
 
-    def __init__(self, video_player):
+    Each command holds the locks of the library and of the player for as
+    long as it runs, as its CommandSpec asks, so parsers of many players
+    sharing one library can execute commands from any number of threads.
+    The library lock is always taken before the player's.
+    """
+
+    def __init__(self, video_player, output=None):
+        """CommandParser constructor.
+
+        Args:
+            video_player: The VideoPlayer commands are executed on.
+            output: The OutputSink for the parser's own messages. Defaults
+                to the player's sink.
+        """
         self._player = video_player
+        self._library_lock = video_player.video_library.lock
+        self._session_lock = video_player.lock
+        self._output = output if output is not None else video_player.output
+
+        # Resolve every handler once, so dispatching a command is a single
+        # dictionary lookup whichever command it is.
+        self._dispatch = {}
+        for name, spec in COMMANDS.items():
+            target = self if spec.on_parser else video_player
+            self._dispatch[name] = (getattr(target, spec.handler), spec)
 
     def execute_command(self, command: Sequence[str]):
-        """Executes the user command. Expects the command to be upper case.
+        """Executes the user command. The command name may be in any case.
            Raises CommandException if a command cannot be parsed.
         """
         if not command:
@@ -24,115 +155,98 @@ class CommandParser:
                 "Please enter a valid command, "
                 "type HELP for a list of available commands.")
 
-        if command[0].upper() == "NUMBER_OF_VIDEOS":
-            self._player.number_of_videos()
-
-        elif command[0].upper() == "SHOW_ALL_VIDEOS":
-            self._player.show_all_videos()
-
-        elif command[0].upper() == "PLAY":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter PLAY command followed by video_id.")
-            self._player.play_video(command[1])
-
-        elif command[0].upper() == "PLAY_RANDOM":
-            self._player.play_random_video()
-
-        elif command[0].upper() == "STOP":
-            self._player.stop_video()
-
-        elif command[0].upper() == "PAUSE":
-            self._player.pause_video()
-
-        elif command[0].upper() == "CONTINUE":
-            self._player.continue_video()
-
-        elif command[0].upper() == "SHOW_PLAYING":
-            self._player.show_playing()
-
-        elif command[0].upper() == "CREATE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CREATE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.create_playlist(command[1])
-
-        elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
-
-        elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
-
-        elif command[0].upper() == "CLEAR_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CLEAR_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.clear_playlist(command[1])
-
-        elif command[0].upper() == "DELETE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter DELETE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.delete_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SHOW_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.show_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
-
-        elif command[0].upper() == "SEARCH_VIDEOS":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS command followed by a "
-                    "search term.")
-            self._player.search_videos(command[1])
-
-        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAG":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
-                    "video tag.")
-            self._player.search_videos_tag(command[1])
-
-        elif command[0].upper() == "FLAG_VIDEO":
-            if len(command) == 3:
-                self._player.flag_video(command[1], command[2])
-            elif len(command) == 2:
-                self._player.flag_video(command[1])
-            else:
-                raise CommandException(
-                    "Please enter FLAG_VIDEO command followed by a "
-                    "video_id and an optional flag reason.")
-
-        elif command[0].upper() == "ALLOW_VIDEO":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter ALLOW_VIDEO command followed by a "
-                    "video_id.")
-            self._player.allow_video(command[1])
-
-        elif command[0].upper() == "HELP":
-            self._get_help()
-        else:
-            print(
+        name = command[0].upper()
+        entry = self._dispatch.get(name)
+        if entry is None:
+            self._output.write_line(
                 "Please enter a valid command, type HELP for a list of "
                 "available commands.")
+            return
+
+        handler, spec = entry
+        arguments = command[1:]
+        if not spec.accepts(len(arguments)):
+            raise CommandException(spec.usage(name))
+        if spec.rest:
+            last = len(spec.arguments) - 1
+            arguments = list(arguments[:last]) + [" ".join(arguments[last:])]
+
+        with self._library_lock.locked(spec.library_access), \
+                self._session_lock.locked(spec.session_access):
+            if spec.takes_arguments:
+                handler(*arguments)
+            else:
+                handler()
+
+    def completions(self, text: str, first_word: bool = False,
+                    limit: int = 10) -> list:
+        """Returns the completions of a word being typed.
+
+        Args:
+            text: The start of the word.
+            first_word: If True, the word is a command name. Otherwise it
+                is a video_id or playlist name.
+            limit: The most completions to return.
+        """
+        if first_word:
+            text = text.upper()
+            return [name for name in COMMANDS if name.startswith(text)][:limit]
+        return self._player.completions(text, limit)
+
+    def _complete(self, prefix, limit=None):
+        """Runs COMPLETE, with an optional result limit."""
+        if limit is None:
+            self._player.show_completions(prefix)
+        else:
+            self._player.show_completions(
+                prefix, self._result_limit(limit, "COMPLETE"))
+
+    def _search_videos(self, search_term, limit=None):
+        """Runs SEARCH_VIDEOS, with an optional result limit."""
+        if limit is not None:
+            limit = self._result_limit(limit, "SEARCH_VIDEOS")
+        self._player.search_videos(search_term, limit)
+
+    def _search_videos_ranked(self, query):
+        """Runs SEARCH_VIDEOS_RANKED, with an optional result limit.
+
+        The query is every word after the command; a last word made only
+        of digits, after at least one other word, is the limit.
+        """
+        words = query.split()
+        limit = None
+        if len(words) > 1 and words[-1].isdigit():
+            query = " ".join(words[:-1])
+            limit = words[-1]
+        if limit is None:
+            self._player.search_videos_ranked(query)
+        else:
+            self._player.search_videos_ranked(
+                query, self._result_limit(limit, "SEARCH_VIDEOS_RANKED"))
+
+    def _search_videos_tag(self, video_tag, *options):
+        """Runs SEARCH_VIDEOS_WITH_TAG, with optional EXACT and limit."""
+        exact = False
+        limit = None
+        for option in options:
+            if option.upper() == "EXACT" and not exact:
+                exact = True
+            elif limit is None:
+                limit = self._result_limit(option, "SEARCH_VIDEOS_WITH_TAG")
+            else:
+                raise CommandException(COMMANDS["SEARCH_VIDEOS_WITH_TAG"].usage(
+                    "SEARCH_VIDEOS_WITH_TAG"))
+        self._player.search_videos_tag(video_tag, exact=exact, limit=limit)
+
+    @staticmethod
+    def _result_limit(limit, name):
+        """Returns a search's result limit as a positive number.
+
+        Raises CommandException with the command's usage if it is not one.
+        """
+        if not limit.isdigit() or int(limit) == 0:
+            raise CommandException(COMMANDS[name].usage(name))
+        return int(limit)
 
     def _get_help(self):
         """Displays all available commands to the user."""
@@ -153,11 +267,15 @@ class CommandParser:
             DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
             SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
             SHOW_ALL_PLAYLISTS - Display all the available playlists.
-            SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
-            SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
+            SEARCH_VIDEOS <search_term> [limit] - Display all the videos (or the first limit) whose titles contain the search_term.
+            SEARCH_VIDEOS_WITH_TAG <tag_name> [EXACT] [limit] -Display all videos (or the first limit) whose tags contains the provided tag (or match it exactly with EXACT).
+            SEARCH_VIDEOS_WITH_TAGS <tag_query> - Display all videos whose tags match a query combining tags with AND, OR, NOT and parentheses (e.g. #cat AND #animal NOT #dog).
+            SEARCH_VIDEOS_RANKED <words> [limit] - Display the 10 (or limit) videos whose titles and tags best match the words (e.g. funny dogs 5).
             FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
             ALLOW_VIDEO <video_id> - Removes a flag from a video.
+            COMPLETE <prefix> [limit] - Lists the video_ids and then the playlist names starting with prefix.
+            SHOW_SEARCH_CACHE - Shows the hits, misses and evictions of the search result cache.
             HELP - Displays help.
             EXIT - Terminates the program execution.
         """)
-        print(help_text)
+        self._output.write_line(help_text)
@@ -0,0 +1,112 @@
+"""A typo-tolerant lookup index kept by the video library."""
+
+
+def _deletes(word: str):
+    """Yields the word and every string made by deleting one character."""
+    yield word
+    for i in range(len(word)):
+        yield word[:i] + word[i + 1:]
+
+
+def within_one_edit(first: str, second: str) -> bool:
+    """Returns True if two strings differ by at most one edit.
+
+    An edit inserts, deletes or substitutes a character, or swaps two
+    adjacent characters.
+    """
+    if first == second:
+        return True
+    if len(first) > len(second):
+        first, second = second, first
+    if len(second) - len(first) > 1:
+        return False
+
+    start = 0
+    while start < len(first) and first[start] == second[start]:
+        start += 1
+    if len(first) < len(second):
+        return first[start:] == second[start + 1:]
+    if first[start + 1:] == second[start + 1:]:
+        return True
+    swapped = second[start + 1:start + 2] + second[start:start + 1]
+    return (first[start:start + 2] == swapped
+            and first[start + 2:] == second[start + 2:])
+
+
+class FuzzyIndex:
+    """A class used to represent a symmetric-delete index of words.
+
+    Every indexed word is stored under itself and under each string made
+    by deleting one of its characters. Two words within one edit of each
+    other share at least one of those strings, so a lookup only has to
+    check the words filed under the query's own deletes, a handful of
+    dictionary lookups whatever the number of words.
+
+    Entries are keyed by the hash of the deleted string to keep the index
+    small; the words found are always checked with within_one_edit.
+    """
+
+    def __init__(self, words=()):
+        """FuzzyIndex constructor.
+
+        Args:
+            words: Words to index.
+        """
+        self._entries = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        """Adds a word to the index."""
+        entries = self._entries
+        for delete in _deletes(word):
+            key = hash(delete)
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = word
+            elif isinstance(entry, str):
+                if entry != word:
+                    entries[key] = [entry, word]
+            elif word not in entry:
+                entry.append(word)
+
+    def remove(self, word: str):
+        """Removes a word from the index, if present."""
+        entries = self._entries
+        for delete in _deletes(word):
+            key = hash(delete)
+            entry = entries.get(key)
+            if entry == word:
+                del entries[key]
+            elif isinstance(entry, list) and word in entry:
+                entry.remove(word)
+                if len(entry) == 1:
+                    entries[key] = entry[0]
+
+    def lookup(self, word: str, limit: int = 3) -> list:
+        """Returns indexed words within one edit of a word.
+
+        Args:
+            word: The possibly mistyped word.
+            limit: The most words to return.
+
+        Returns:
+            The closest words: an exact match first, the others sorted.
+        """
+        entries = self._entries
+        candidates = set()
+        for delete in _deletes(word):
+            entry = entries.get(hash(delete))
+            if entry is None:
+                continue
+            if isinstance(entry, str):
+                candidates.add(entry)
+            else:
+                candidates.update(entry)
+
+        matches = sorted(candidate for candidate in candidates
+                         if within_one_edit(word, candidate))
+        if word in candidates:
+            matches.remove(word)
+            matches.insert(0, word)
+        return matches[:limit]
@@ -0,0 +1,56 @@
+"""A moderation store class."""
+
+
+class ModerationStore:
+    """A class used to represent which videos are flagged, and why.
+
+    Moderation state is kept apart from the immutable catalog so that one
+    store, like the catalog, can be shared by every session. Only flagged
+    videos take up space, keyed by their video_id.
+    """
+
+    def __init__(self):
+        """ModerationStore constructor."""
+        self._reasons = {}
+        self._listing_lines = {}
+
+    def __len__(self):
+        return len(self._reasons)
+
+    def __contains__(self, video_id):
+        return video_id in self._reasons
+
+    def is_flagged(self, video_id: str) -> bool:
+        """Returns a boolean if a video is flagged."""
+        return video_id in self._reasons
+
+    def reason(self, video_id: str) -> str:
+        """Returns the reason a video was flagged, empty if it is not."""
+        return self._reasons.get(video_id, "")
+
+    def flagged_video_ids(self):
+        """Returns the ids of every flagged video."""
+        return self._reasons.keys()
+
+    def flag(self, video_id: str, reason: str):
+        """Marks a video as flagged, replacing any previous reason."""
+        self._reasons[video_id] = reason
+        self._listing_lines.pop(video_id, None)
+
+    def allow(self, video_id: str):
+        """Removes the flag from a video, if it has one."""
+        self._reasons.pop(video_id, None)
+        self._listing_lines.pop(video_id, None)
+
+    def listing_line(self, video_id: str, display_line: str) -> str:
+        """Returns the display line of a flagged video with its FLAGGED mark.
+
+        The marked line is built once per flag and reused until the flag
+        changes.
+        """
+        line = self._listing_lines.get(video_id)
+        if line is None:
+            line = (display_line + " - FLAGGED (reason: "
+                    + self._reasons[video_id] + ")")
+            self._listing_lines[video_id] = line
+        return line
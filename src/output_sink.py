@@ -0,0 +1,134 @@
+"""Output sinks the video player writes its results to."""
+
+import abc
+import sys
+
+# Number of lines joined into a single write by write_lines.
+CHUNK_LINES = 4096
+
+
+class OutputSink(abc.ABC):
+    """A class used to represent where command output is written.
+
+    Subclasses implement write(); lines are written with write_line() and
+    long listings with write_lines(), which joins them into chunks so a
+    listing costs one write per chunk rather than one per line.
+    """
+
+    @abc.abstractmethod
+    def write(self, text: str):
+        """Writes text as is."""
+
+    def write_line(self, line: str):
+        """Writes one line of output."""
+        self.write(line + "\n")
+
+    def write_lines(self, lines):
+        """Writes every line of an iterable, in chunks."""
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == CHUNK_LINES:
+                chunk.append("")
+                self.write("\n".join(chunk))
+                chunk = []
+        if chunk:
+            chunk.append("")
+            self.write("\n".join(chunk))
+
+    def flush(self):
+        """Makes sure everything written so far has been delivered."""
+
+
+class StdoutSink(OutputSink):
+    """A class used to represent output printed to standard output.
+
+    sys.stdout is looked up on every write, so redirecting or capturing it
+    works the same as it does for print().
+    """
+
+    def write(self, text: str):
+        sys.stdout.write(text)
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+class BufferedFileSink(OutputSink):
+    """A class used to represent output buffered in memory for a file.
+
+    Text is collected until buffer_size characters are waiting and then
+    written to the file in a single call.
+    """
+
+    def __init__(self, file, buffer_size: int = 1 << 16):
+        """BufferedFileSink constructor.
+
+        Args:
+            file: A text file object to write to.
+            buffer_size: Number of characters to collect before writing.
+        """
+        self._file = file
+        self._buffer_size = buffer_size
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._buffer_size:
+            self._write_buffer()
+
+    def _write_buffer(self):
+        """Writes the collected text to the file."""
+        self._file.write("".join(self._buffer))
+        self._buffer = []
+        self._buffered = 0
+
+    def flush(self):
+        self._write_buffer()
+        self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+class MemorySink(OutputSink):
+    """A class used to represent output collected in memory."""
+
+    def __init__(self):
+        """MemorySink constructor."""
+        self._parts = []
+
+    def write(self, text: str):
+        self._parts.append(text)
+
+    def getvalue(self) -> str:
+        """Returns everything written so far."""
+        return "".join(self._parts)
+
+    def lines(self) -> list:
+        """Returns everything written so far, split into lines."""
+        return self.getvalue().splitlines()
+
+    def clear(self):
+        """Forgets everything written so far."""
+        self._parts = []
+
+
+class NullSink(OutputSink):
+    """A class used to represent output that is thrown away.
+
+    Listings passed to write_lines are still generated in full, so
+    benchmarks using this sink measure the work without the I/O.
+    """
+
+    def write(self, text: str):
+        pass
+
+    def write_lines(self, lines):
+        for _ in lines:
+            pass
@@ -0,0 +1,56 @@
+"""A playback state class."""
+
+# States a session's current video can be in.
+STOPPED = "stopped"
+PLAYING = "playing"
+PAUSED = "paused"
+
+
+class PlaybackState:
+    """A class used to represent what one session is playing.
+
+    Holds the current video and whether it is playing or paused; every
+    transition is constant time. Kept per session, apart from the shared
+    catalog.
+    """
+
+    __slots__ = ("_video", "_state")
+
+    def __init__(self):
+        """PlaybackState constructor."""
+        self._video = None
+        self._state = STOPPED
+
+    @property
+    def video(self):
+        """Returns the current video, None when stopped."""
+        return self._video
+
+    @property
+    def state(self) -> str:
+        """Returns STOPPED, PLAYING or PAUSED."""
+        return self._state
+
+    def play(self, video):
+        """Makes a video the current one, in the playing state."""
+        self._video = video
+        self._state = PLAYING
+
+    def pause(self):
+        """Pauses the current video."""
+        self._state = PAUSED
+
+    def resume(self):
+        """Resumes the current paused video."""
+        self._state = PLAYING
+
+    def stop(self):
+        """Stops the current video.
+
+        Returns:
+            The video that was playing or paused, None if there was none.
+        """
+        video = self._video
+        self._video = None
+        self._state = STOPPED
+        return video
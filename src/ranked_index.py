@@ -0,0 +1,111 @@
+"""A relevance-ranked search index kept by the video library."""
+
+from heapq import nsmallest
+import math
+import re
+
+# BM25 term frequency saturation and document length normalization.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> list:
+    """Splits text into lower-cased words.
+
+    Anything that is not a letter or digit separates words, so the '#'
+    of a tag and the '_' between words are dropped.
+    """
+    return _TOKEN.findall(text.lower())
+
+
+class RankedIndex:
+    """A class used to represent a BM25 index over video titles and tags.
+
+    Each video is a document made of the words of its title and tags.
+    Every word points to the videos containing it and how often it occurs
+    there, and the index keeps the length of every document, so a query
+    only reads the postings of its own words and scores them with BM25.
+    """
+
+    def __init__(self):
+        """RankedIndex constructor."""
+        self._postings = {}
+        self._lengths = {}
+        self._terms = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, video_id):
+        return video_id in self._lengths
+
+    def add(self, video_id: str, title: str, tags):
+        """Adds a video's title and tags to the index."""
+        if video_id in self._lengths:
+            return
+
+        words = tokenize(title)
+        for tag in tags:
+            words.extend(tokenize(tag))
+
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        for word, count in counts.items():
+            self._postings.setdefault(word, {})[video_id] = count
+
+        self._terms[video_id] = tuple(counts)
+        self._lengths[video_id] = len(words)
+        self._total_length += len(words)
+
+    def remove(self, video_id: str):
+        """Removes a video from the index."""
+        length = self._lengths.pop(video_id, None)
+        if length is None:
+            return
+
+        self._total_length -= length
+        for word in self._terms.pop(video_id):
+            postings = self._postings[word]
+            del postings[video_id]
+            if not postings:
+                del self._postings[word]
+
+    def search(self, query: str, limit: int = 10):
+        """Returns the indexed videos that best match a query.
+
+        Args:
+            query: Words to look for, separated by anything that is not a
+                letter or digit.
+            limit: The most results to return.
+
+        Returns:
+            A list of (video_id, score) pairs, best first. Videos with
+            equal scores are ordered by video_id.
+        """
+        num_videos = len(self._lengths)
+        if not num_videos:
+            return []
+
+        average_length = self._total_length / num_videos or 1
+        lengths = self._lengths
+        scores = {}
+        for word in set(tokenize(query)):
+            postings = self._postings.get(word)
+            if postings is None:
+                continue
+
+            idf = math.log(1 + (num_videos - len(postings) + 0.5)
+                           / (len(postings) + 0.5))
+            for video_id, count in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[video_id]
+                                  / average_length)
+                scores[video_id] = (scores.get(video_id, 0.0)
+                                    + idf * count * (BM25_K1 + 1)
+                                    / (count + norm))
+
+        return nsmallest(limit, scores.items(),
+                         key=lambda item: (-item[1], item[0]))
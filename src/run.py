@@ -1,14 +1,51 @@
 """A youtube terminal simulator."""
+from .video_library import VideoLibrary
 from .video_player import VideoPlayer
 from .command_parser import CommandException
 from .command_parser import CommandParser
+from .output_sink import BufferedFileSink, StdoutSink
+import argparse
+import contextlib
+import sys
+import time
 
+try:
+    import readline
+except ImportError:  # Not available on every platform.
+    readline = None
 
-if __name__ == "__main__":
+# Size of the buffer batch mode writes its output through.
+BATCH_BUFFER_SIZE = 1 << 16
+
+
+def install_completion(parser):
+    """Completes commands, video ids and playlist names with the Tab key.
+
+    Does nothing where the readline module is not available.
+    """
+    if readline is None:
+        return
+
+    matches = []
+
+    def complete(text, state):
+        if state == 0:
+            first_word = not readline.get_line_buffer()[:readline.get_begidx()].strip()
+            matches[:] = parser.completions(text, first_word)
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer(complete)
+    readline.set_completer_delims(" \t")
+    readline.parse_and_bind("tab: complete")
+
+
+def run_interactive():
+    """Runs the simulator on commands typed by the user."""
     print("""Hello and welcome to YouTube, what would you like to do?
     Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
+    video_player = VideoPlayer(VideoLibrary(suggestions=True))
     parser = CommandParser(video_player)
+    install_completion(parser)
     while True:
         command = input("YT> ")
         if command.upper() == "EXIT":
@@ -19,3 +56,73 @@ if __name__ == "__main__":
             print(e)
     print("YouTube has now terminated its execution. "
           "Thank you and goodbye!")
+
+
+def run_batch(command_lines, output=None, parser=None):
+    """Runs the simulator on a sequence of command lines.
+
+    No prompts are printed, blank lines are skipped and an EXIT line stops
+    the run. Questions asked after a search are answered with no.
+
+    Args:
+        command_lines: An iterable of command lines, such as an open file.
+        output: The OutputSink to write results to. Defaults to standard
+            output.
+        parser: The CommandParser to run the commands with, so the
+            library can be loaded beforehand. Defaults to a new one over a
+            non-interactive player writing to output.
+
+    Returns:
+        The number of commands executed.
+    """
+    if output is None:
+        output = StdoutSink()
+    if parser is None:
+        parser = CommandParser(VideoPlayer(interactive=False, output=output))
+    executed = 0
+    for line in command_lines:
+        command = line.split()
+        if not command:
+            continue
+        if command[0].upper() == "EXIT":
+            break
+
+        executed += 1
+        try:
+            parser.execute_command(command)
+        except CommandException as e:
+            output.write_line(str(e))
+    return executed
+
+
+def main(argv=None):
+    """Runs the simulator interactively or in batch mode."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--batch", nargs="?", const="-", metavar="FILE",
+        help="run the commands in FILE (or standard input when FILE is "
+             "omitted or '-') without prompting, then report throughput")
+    args = arg_parser.parse_args(argv)
+
+    if args.batch is None:
+        run_interactive()
+        return
+
+    # Standard input is not ours to close.
+    command_file = (contextlib.nullcontext(sys.stdin) if args.batch == "-"
+                    else open(args.batch))
+    with command_file as command_lines, \
+            BufferedFileSink(sys.stdout, BATCH_BUFFER_SIZE) as output:
+        # Only running the commands is timed, not loading the catalog.
+        parser = CommandParser(VideoPlayer(interactive=False, output=output))
+        start = time.perf_counter()
+        executed = run_batch(command_lines, output, parser)
+        elapsed = time.perf_counter() - start
+
+    rate = executed / elapsed if elapsed else float("inf")
+    print(f"Executed {executed} commands in {elapsed:.3f} seconds "
+          f"({rate:.0f} commands/second)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
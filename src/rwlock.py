@@ -0,0 +1,84 @@
+"""A reader/writer lock class."""
+
+from contextlib import contextmanager, nullcontext
+import threading
+
+# Ways a command can access a structure guarded by a ReadWriteLock.
+READ = "read"
+WRITE = "write"
+
+
+class ReadWriteLock:
+    """A class used to represent a lock shared by readers and held by one writer.
+
+    Any number of threads may hold the lock for reading at once, while a
+    writer holds it alone. Waiting writers go first: new readers wait
+    while a writer is queued, so a stream of searches cannot starve a
+    FLAG_VIDEO. The lock is not reentrant.
+    """
+
+    def __init__(self):
+        """ReadWriteLock constructor."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        """Blocks until the lock can be shared with other readers."""
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """Releases one reader's hold on the lock."""
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        """Blocks until no other thread holds the lock."""
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+
+    def release_write(self):
+        """Releases the writer's hold on the lock."""
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        """Holds the lock for reading inside a with block."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        """Holds the lock for writing inside a with block."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def locked(self, access):
+        """Returns a context manager holding the lock for an access.
+
+        Args:
+            access: READ, WRITE, or None for no locking at all.
+        """
+        if access == READ:
+            return self.reading()
+        if access == WRITE:
+            return self.writing()
+        return nullcontext()
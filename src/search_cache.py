@@ -0,0 +1,84 @@
+"""A search result cache kept by the video library."""
+
+from collections import OrderedDict
+from typing import NamedTuple
+import threading
+
+
+class CacheStats(NamedTuple):
+    """A class used to represent how well a SearchCache is doing.
+
+    Attributes:
+        hits: Lookups answered from the cache.
+        misses: Lookups that found nothing, or only a stale result.
+        evictions: Results dropped to make room for newer ones.
+        size: Results currently cached.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """Returns the fraction of lookups that were hits, 0 if none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SearchCache:
+    """A class used to represent a bounded LRU cache of search results.
+
+    Every result is stored with the catalog generation it was computed
+    at. A lookup made at a later generation treats the result as missing,
+    so bumping the generation invalidates every entry at once without
+    touching them; stale entries are dropped as they are found or
+    evicted. Lookups may come from many threads at once.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """SearchCache constructor.
+
+        Args:
+            max_entries: The most results to keep. 0 disables the cache.
+        """
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, generation: int):
+        """Returns the result cached for key at generation, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, key, generation: int, result):
+        """Caches the result for key computed at generation."""
+        if not self._max_entries:
+            return
+        with self._lock:
+            self._entries[key] = (generation, result)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> CacheStats:
+        """Returns the hit, miss and eviction counts so far."""
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              len(self._entries))
@@ -0,0 +1,283 @@
+"""Search indexes kept by the video library."""
+
+from bisect import bisect_left, insort
+from heapq import merge
+
+# Length of the n-grams used by the title index.
+NGRAM_LENGTH = 3
+
+
+def _ngrams(text: str):
+    """Returns the set of distinct n-grams of a piece of text."""
+    return {text[i:i + NGRAM_LENGTH]
+            for i in range(len(text) - NGRAM_LENGTH + 1)}
+
+
+def remove_sorted(sorted_list: list, item):
+    """Removes an item from a sorted list, if present."""
+    index = bisect_left(sorted_list, item)
+    if index < len(sorted_list) and sorted_list[index] == item:
+        del sorted_list[index]
+
+
+def complete_sorted(sorted_list: list, prefix: str, limit: int) -> list:
+    """Returns the first items of a sorted list of strings with a prefix.
+
+    Takes time proportional to the prefix and the number of items returned,
+    not to the length of the list.
+    """
+    start = bisect_left(sorted_list, prefix)
+    completions = []
+    for item in sorted_list[start:start + limit]:
+        if not item.startswith(prefix):
+            break
+        completions.append(item)
+    return completions
+
+
+class TitleIndex:
+    """A class used to represent a trigram index over video titles.
+
+    Every indexed title is lower-cased once and each of its trigrams points
+    to a sorted list of video ids (its postings). A substring search only
+    has to check the videos in the shortest postings list of the term's
+    trigrams instead of every title in the library.
+    """
+
+    def __init__(self):
+        """TitleIndex constructor."""
+        self._titles = {}
+        self._postings = {}
+        self._video_ids = []
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __contains__(self, video_id):
+        return video_id in self._titles
+
+    def add_all(self, videos):
+        """Indexes many (video_id, title) pairs at once.
+
+        On an empty index the pairs are sorted once up front so that every
+        postings list is built by appending instead of inserting.
+        """
+        videos = sorted(videos)
+        if self._titles:
+            for video_id, title in videos:
+                self.add(video_id, title)
+            return
+
+        for video_id, title in videos:
+            if video_id in self._titles:
+                continue
+
+            title = title.lower()
+            self._titles[video_id] = title
+            self._video_ids.append(video_id)
+            for ngram in _ngrams(title):
+                self._postings.setdefault(ngram, []).append(video_id)
+
+    def add(self, video_id: str, title: str):
+        """Adds a video title to the index."""
+        if video_id in self._titles:
+            return
+
+        title = title.lower()
+        self._titles[video_id] = title
+        insort(self._video_ids, video_id)
+        for ngram in _ngrams(title):
+            insort(self._postings.setdefault(ngram, []), video_id)
+
+    def remove(self, video_id: str):
+        """Removes a video title from the index."""
+        title = self._titles.pop(video_id, None)
+        if title is None:
+            return
+
+        remove_sorted(self._video_ids, video_id)
+        for ngram in _ngrams(title):
+            postings = self._postings[ngram]
+            remove_sorted(postings, video_id)
+            if not postings:
+                del self._postings[ngram]
+
+    def iter_search(self, search_term: str):
+        """Yields the ids of indexed videos whose title contains the term.
+
+        Matching is a case-insensitive substring match, the same as
+        `search_term.lower() in title.lower()`. Terms shorter than three
+        characters have no trigram to look up, so every indexed title is
+        checked instead.
+
+        Candidates are checked one at a time as the ids are consumed, so
+        a caller that stops early never checks the rest. The index must
+        not change while the generator is in use.
+
+        Args:
+            search_term: The query to be used in search.
+
+        Yields:
+            The matching video ids, in sorted order.
+        """
+        search_term = search_term.lower()
+        ngrams = _ngrams(search_term)
+
+        if not ngrams:
+            candidates = self._video_ids
+        else:
+            candidates = None
+            for ngram in ngrams:
+                postings = self._postings.get(ngram)
+                if postings is None:
+                    return
+                if candidates is None or len(postings) < len(candidates):
+                    candidates = postings
+
+        titles = self._titles
+        for video_id in candidates:
+            if search_term in titles[video_id]:
+                yield video_id
+
+    def search(self, search_term: str):
+        """Returns the ids of indexed videos whose title contains the term.
+
+        Args:
+            search_term: The query to be used in search.
+
+        Returns:
+            The matching video ids, sorted.
+        """
+        return list(self.iter_search(search_term))
+
+
+class TagIndex:
+    """A class used to represent an inverted index from tags to videos.
+
+    Tags are handled as ids from the catalog's TagDictionary. Every tag id
+    points to the sorted list of ids of the videos carrying it, so a tag
+    query only touches the videos that have the tag. Queries ignore case:
+    each lower-cased tag name maps to the tag ids that share it.
+    """
+
+    def __init__(self, tag_dictionary):
+        """TagIndex constructor.
+
+        Args:
+            tag_dictionary: The TagDictionary the indexed tag ids refer to.
+        """
+        self._tag_dictionary = tag_dictionary
+        self._tag_ids = {}
+        self._postings = {}
+        self._lowered = {}
+
+    def _add_postings(self, tag_id):
+        """Returns the postings of a tag id, creating them if needed."""
+        postings = self._postings.get(tag_id)
+        if postings is None:
+            postings = self._postings[tag_id] = []
+            lowered = self._tag_dictionary.name(tag_id).lower()
+            self._lowered.setdefault(lowered, set()).add(tag_id)
+        return postings
+
+    def _remove_postings(self, tag_id):
+        """Drops the empty postings of a tag id."""
+        del self._postings[tag_id]
+        lowered = self._tag_dictionary.name(tag_id).lower()
+        tag_ids = self._lowered[lowered]
+        tag_ids.discard(tag_id)
+        if not tag_ids:
+            del self._lowered[lowered]
+
+    def add_all(self, videos):
+        """Indexes many (video_id, tag_ids) pairs at once.
+
+        On an empty index the pairs are sorted once up front so that every
+        postings list is built by appending instead of inserting.
+        """
+        videos = sorted(videos)
+        if self._tag_ids:
+            for video_id, tag_ids in videos:
+                self.add(video_id, tag_ids)
+            return
+
+        for video_id, tag_ids in videos:
+            if video_id in self._tag_ids:
+                continue
+
+            tag_ids = frozenset(tag_ids)
+            self._tag_ids[video_id] = tag_ids
+            for tag_id in tag_ids:
+                self._add_postings(tag_id).append(video_id)
+
+    def add(self, video_id: str, tag_ids):
+        """Adds the tag ids of a video to the index."""
+        if video_id in self._tag_ids:
+            return
+
+        tag_ids = frozenset(tag_ids)
+        self._tag_ids[video_id] = tag_ids
+        for tag_id in tag_ids:
+            insort(self._add_postings(tag_id), video_id)
+
+    def remove(self, video_id: str):
+        """Removes the tags of a video from the index."""
+        tag_ids = self._tag_ids.pop(video_id, None)
+        if tag_ids is None:
+            return
+
+        for tag_id in tag_ids:
+            postings = self._postings[tag_id]
+            remove_sorted(postings, video_id)
+            if not postings:
+                self._remove_postings(tag_id)
+
+    def iter_search(self, video_tag: str, exact: bool = False):
+        """Yields the ids of indexed videos matching a tag.
+
+        The postings of the matching tags are merged as the ids are
+        consumed, so a caller that stops early never reads the rest. The
+        index must not change while the generator is in use.
+
+        Args:
+            video_tag: The video tag to be used in search. Tags must start
+                with '#'.
+            exact: If True, only videos carrying exactly this tag (ignoring
+                case) match. Otherwise any video with a tag containing
+                video_tag matches, so "#ca" also finds "#cat".
+
+        Yields:
+            The matching video ids, in sorted order.
+        """
+        if "#" not in video_tag:
+            return
+
+        video_tag = video_tag.lower()
+        if exact:
+            tag_ids = self._lowered.get(video_tag, ())
+        else:
+            tag_ids = [tag_id for lowered, ids in self._lowered.items()
+                       if video_tag in lowered for tag_id in ids]
+
+        matching_postings = [self._postings[tag_id] for tag_id in tag_ids]
+        if len(matching_postings) == 1:
+            yield from matching_postings[0]
+            return
+
+        previous = None
+        for video_id in merge(*matching_postings):
+            if video_id != previous:
+                yield video_id
+                previous = video_id
+
+    def search(self, video_tag: str, exact: bool = False):
+        """Returns the ids of indexed videos matching a tag.
+
+        Args:
+            video_tag: The video tag to be used in search.
+            exact: If True, only videos carrying exactly this tag match.
+
+        Returns:
+            The matching video ids, sorted.
+        """
+        return list(self.iter_search(video_tag, exact))
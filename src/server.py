@@ -0,0 +1,254 @@
+"""A youtube simulator server for many concurrent users.
+
+Every TCP connection gets its own session (video player, playlists and
+playback), while all sessions share one loaded VideoLibrary. The protocol
+is line based: the client sends one command per line and the server
+answers with the command's output followed by the "YT> " prompt, which
+marks the end of the response. EXIT closes the connection.
+
+Commands run on the event loop by default. With --threads they run on a
+thread pool instead, so a long listing or search does not hold up other
+connections; the locks taken by CommandParser keep sessions sharing the
+library consistent.
+
+Output is sent as it is produced, and a command never waits long for
+its client, since it holds the library and session locks. On a thread
+pool a command waits up to DRAIN_TIMEOUT seconds whenever the client
+falls behind; on the event loop it cannot wait at all and stops once
+MAX_BUFFERED_OUTPUT bytes are waiting. Either way the rest of its output
+is dropped, so memory per connection stays bounded however long the
+output and a client that stops reading cannot hold up other sessions.
+"""
+from .video_library import VideoLibrary
+from .video_player import VideoPlayer
+from .command_parser import CommandException
+from .command_parser import CommandParser
+from .output_sink import OutputSink
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import sys
+
+PROMPT = b"YT> "
+GREETING = ("Hello and welcome to YouTube, what would you like to do?\n"
+            "    Enter HELP for list of available commands or EXIT to "
+            "terminate.\n")
+GOODBYE = ("YouTube has now terminated its execution. "
+           "Thank you and goodbye!\n")
+
+# Longest command line accepted from a client.
+MAX_LINE_LENGTH = 1 << 16
+# Outgoing bytes buffered for a connection before the session waits for
+# the client to read them.
+WRITE_BUFFER_HIGH = 1 << 18
+# Characters of output collected before they are sent to the client.
+OUTPUT_CHUNK = 1 << 16
+# Outgoing bytes a command running on the event loop may leave waiting
+# for a slow client before the rest of its output is dropped.
+MAX_BUFFERED_OUTPUT = 1 << 22
+# Seconds a command running on a thread waits for a slow client to read
+# its output before the rest of it is dropped.
+DRAIN_TIMEOUT = 1.0
+TRUNCATED = "Output truncated: the connection is not reading fast enough.\n"
+
+
+class OutputTruncated(Exception):
+    """A class used to represent output dropped for a slow client."""
+    pass
+
+
+class ConnectionSink(OutputSink):
+    """A class used to represent output sent to a client as it is produced.
+
+    Text is collected into chunks of OUTPUT_CHUNK characters, each handed
+    to the connection's transport when full and at the end of a command.
+    If the sink is given the event loop, it is written from another thread
+    and waits for the client to read each chunk before taking the next,
+    raising OutputTruncated if that takes more than DRAIN_TIMEOUT seconds.
+    Otherwise it runs on the loop itself and raises OutputTruncated when
+    more than MAX_BUFFERED_OUTPUT bytes are already waiting.
+    """
+
+    def __init__(self, writer, loop=None):
+        """ConnectionSink constructor.
+
+        Args:
+            writer: The asyncio StreamWriter of the connection.
+            loop: The event loop of the connection, when the sink is
+                written from a thread other than the loop's.
+        """
+        self._writer = writer
+        self._loop = loop
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= OUTPUT_CHUNK:
+            self.flush()
+
+    def flush(self):
+        data = "".join(self._buffer).encode()
+        self._buffer = []
+        self._buffered = 0
+        if not data:
+            return
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._send(data), self._loop).result()
+            return
+        if self._writer.transport.get_write_buffer_size() > MAX_BUFFERED_OUTPUT:
+            raise OutputTruncated()
+        self._writer.write(data)
+
+    def send_now(self, text: str):
+        """Sends text without buffering or waiting, even past the limit."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._writer.write, text.encode())
+        else:
+            self._writer.write(text.encode())
+
+    async def _send(self, data):
+        """Writes data and waits, for a while, until the client keeps up."""
+        self._writer.write(data)
+        try:
+            await asyncio.wait_for(self._writer.drain(), DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise OutputTruncated() from None
+
+
+class Session:
+    """A class used to represent one connected user.
+
+    Search questions are never read from the connection; the answer is
+    always taken to be no.
+    """
+
+    def __init__(self, video_library, output):
+        """Session constructor.
+
+        Args:
+            video_library: The VideoLibrary shared by every session.
+            output: The ConnectionSink of the session's connection.
+        """
+        self._output = output
+        self._parser = CommandParser(VideoPlayer(
+            video_library, interactive=False, output=output))
+
+    def execute(self, line: str):
+        """Runs one command line and sends all of its output."""
+        try:
+            try:
+                self._parser.execute_command(line.split())
+            except CommandException as e:
+                self._output.write_line(str(e))
+            self._output.flush()
+        except OutputTruncated:
+            self._output.send_now(TRUNCATED)
+
+
+async def handle_connection(video_library, reader, writer, executor=None):
+    """Serves one client until it sends EXIT or disconnects.
+
+    Commands run on executor if one is given, else on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+    output = ConnectionSink(writer, loop if executor is not None else None)
+    session = Session(video_library, output)
+    try:
+        writer.write(GREETING.encode() + PROMPT)
+        await writer.drain()
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # The client sent a line longer than MAX_LINE_LENGTH.
+                break
+            if not line:
+                break
+
+            line = line.decode(errors="replace")
+            if line.strip().upper() == "EXIT":
+                writer.write(GOODBYE.encode())
+                break
+
+            if executor is None:
+                session.execute(line)
+            else:
+                await loop.run_in_executor(executor, session.execute, line)
+            writer.write(PROMPT)
+            # Waits while the client is slower to read than we write.
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(video_library, host="127.0.0.1", port=0,
+                       executor=None):
+    """Starts serving video_library.
+
+    Args:
+        video_library: The VideoLibrary shared by every session.
+        host: The address to listen on.
+        port: The port to listen on; 0 picks a free port.
+        executor: An optional concurrent.futures.Executor commands run on.
+
+    Returns:
+        The asyncio Server.
+    """
+    async def handle(reader, writer):
+        await handle_connection(video_library, reader, writer, executor)
+
+    return await asyncio.start_server(handle, host, port,
+                                      limit=MAX_LINE_LENGTH)
+
+
+async def serve(video_library, host, port, executor=None):
+    """Serves video_library until cancelled."""
+    server = await start_server(video_library, host, port, executor)
+    for sock in server.sockets:
+        print("Serving on %s:%s" % sock.getsockname()[:2])
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """Loads the catalog and serves it."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--catalog", metavar="SOURCE", action="append",
+                            help="catalog file or glob to serve instead of "
+                                 "videos.txt; may be repeated")
+    arg_parser.add_argument("--lazy", action="store_true",
+                            help="parse catalog rows on first use")
+    arg_parser.add_argument("--threads", type=int, default=0, metavar="N",
+                            help="run commands on a pool of N threads")
+    args = arg_parser.parse_args(argv)
+
+    video_library = VideoLibrary(args.catalog, lazy=args.lazy,
+                                 suggestions=True)
+    if video_library.duplicate_video_ids:
+        print(f"{len(video_library.duplicate_video_ids)} video ids appear "
+              "more than once; serving the first row of each",
+              file=sys.stderr)
+    executor = ThreadPoolExecutor(args.threads) if args.threads else None
+    try:
+        asyncio.run(serve(video_library, args.host, args.port, executor))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Boolean tag queries evaluated on bitsets."""
+
+from bisect import bisect_left
+import re
+
+try:
+    import numpy as np
+except ImportError:  # Python ints are used as bitsets instead.
+    np = None
+
+_QUERY_TOKEN = re.compile(r"[()]|[^\s()]+")
+_OPERATORS = ("AND", "OR", "NOT")
+# Bytes of a NumPy bitset scanned at a time for the first set bits.
+_SCAN_CHUNK = 1 << 14
+# Deepest nesting of parentheses a query may use.
+MAX_QUERY_DEPTH = 32
+
+
+def _bitset(ordinals, size):
+    """Returns a bitset of size bits with the given ordinals set."""
+    if np is not None:
+        bits = np.zeros(size, dtype=bool)
+        bits[np.asarray(ordinals, dtype=np.int64)] = True
+        return np.packbits(bits, bitorder="little")
+
+    packed = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        packed[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(packed, "little")
+
+
+def _full_bitset(size):
+    """Returns a bitset of size bits, all set."""
+    if np is not None:
+        return _bitset(np.arange(size), size)
+    return (1 << size) - 1
+
+
+def _set_bit(bitset, ordinal, value):
+    """Returns bitset with one bit set or cleared, in place if possible."""
+    if np is not None:
+        if value:
+            bitset[ordinal >> 3] |= np.uint8(1 << (ordinal & 7))
+        else:
+            bitset[ordinal >> 3] &= np.uint8(~(1 << (ordinal & 7)) & 0xFF)
+        return bitset
+
+    if value:
+        return bitset | (1 << ordinal)
+    return bitset & ~(1 << ordinal)
+
+
+def _ordinals(bitset, limit=None):
+    """Returns the first limit ordinals set in a bitset, in ascending order.
+
+    All of them if limit is None.
+    """
+    if np is not None:
+        # Only the bytes with a bit set are unpacked, and no more of them
+        # than the limit needs.
+        if limit is None:
+            offsets = np.flatnonzero(bitset)
+        else:
+            offsets = np.zeros(0, dtype=np.intp)
+            for start in range(0, len(bitset), _SCAN_CHUNK):
+                chunk = bitset[start:start + _SCAN_CHUNK]
+                offsets = np.concatenate(
+                    (offsets, np.flatnonzero(chunk) + start))[:limit]
+                if len(offsets) == limit:
+                    break
+        bits = np.unpackbits(bitset[offsets][:, None], axis=1,
+                             bitorder="little").astype(bool)
+        return (offsets[:, None] * 8 + np.arange(8))[bits][:limit].tolist()
+
+    # The binary digits reversed, so the character at i is bit i.
+    digits = bin(bitset)[:1:-1]
+    ordinals = []
+    ordinal = digits.find("1")
+    while ordinal != -1 and len(ordinals) != limit:
+        ordinals.append(ordinal)
+        ordinal = digits.find("1", ordinal + 1)
+    return ordinals
+
+
+class TagBitsets:
+    """A class used to represent one bitset per tag over video ordinals.
+
+    A video's ordinal is its position in video_id order. Each tag, lower
+    cased, has a bitset with the bits of the videos carrying it, and one
+    more bitset marks the flagged videos, so AND, OR and NOT are bitwise
+    operations over the whole catalog at once and the bits left set are
+    already in video_id order. Bitsets are NumPy arrays of packed bits
+    when NumPy is installed, and Python ints otherwise.
+
+    Flags can change in place; adding or removing videos shifts the
+    ordinals, so the library builds new bitsets instead.
+    """
+
+    def __init__(self, video_ids, tag_names, tagged):
+        """TagBitsets constructor.
+
+        Args:
+            video_ids: Every video_id, sorted; ordinals index this list.
+            tag_names: The name of every tag id, as in a TagDictionary.
+            tagged: (ordinal, tag_ids, flagged) for every video.
+        """
+        self._video_ids = video_ids
+        self._size = len(video_ids)
+
+        ordinals_by_tag = {}
+        flagged_ordinals = []
+        for ordinal, tag_ids, flagged in tagged:
+            for tag_id in tag_ids:
+                ordinals_by_tag.setdefault(tag_id, []).append(ordinal)
+            if flagged:
+                flagged_ordinals.append(ordinal)
+
+        ordinals_by_name = {}
+        for tag_id, ordinals in ordinals_by_tag.items():
+            ordinals_by_name.setdefault(
+                tag_names[tag_id].lower(), []).extend(ordinals)
+
+        self._bitsets = {name: _bitset(ordinals, self._size)
+                         for name, ordinals in ordinals_by_name.items()}
+        self._empty = _bitset((), self._size)
+        self._all = _full_bitset(self._size)
+        self._flagged = _bitset(flagged_ordinals, self._size)
+
+    def set_flagged(self, video_id: str, flagged: bool):
+        """Marks a video as flagged or not."""
+        ordinal = bisect_left(self._video_ids, video_id)
+        if ordinal < self._size and self._video_ids[ordinal] == video_id:
+            self._flagged = _set_bit(self._flagged, ordinal, flagged)
+
+    def query(self, tag_query: str, limit: int = None) -> list:
+        """Returns the ids of the unflagged videos matching a tag query.
+
+        Queries combine tags with AND, OR and NOT, in any case, and
+        parentheses. NOT binds tightest and AND binds tighter than OR; a
+        tag followed directly by another, or by NOT, is ANDed with it, so
+        "#cat AND #animal NOT #dog" is "#cat AND #animal AND NOT #dog".
+        Tags match exactly, ignoring case.
+
+        Args:
+            tag_query: The query to evaluate.
+            limit: The most video ids to return. None for no limit.
+
+        Returns:
+            The matching video ids, sorted.
+
+        Raises:
+            ValueError: If the query is malformed or nests parentheses
+                more than MAX_QUERY_DEPTH deep.
+        """
+        tokens = [token.upper() if token.upper() in _OPERATORS
+                  else token.lower()
+                  for token in _QUERY_TOKEN.findall(tag_query)]
+        if not tokens:
+            raise ValueError("the query is empty")
+
+        position, bitset = self._parse_or(tokens, 0, 0)
+        if position != len(tokens):
+            raise ValueError("unexpected " + tokens[position])
+
+        bitset = bitset & ~self._flagged & self._all
+        return [self._video_ids[ordinal]
+                for ordinal in _ordinals(bitset, limit)]
+
+    def _parse_or(self, tokens, position, depth):
+        """Evaluates terms joined by OR, inside depth parentheses."""
+        position, bitset = self._parse_and(tokens, position, depth)
+        while position < len(tokens) and tokens[position] == "OR":
+            position, right = self._parse_and(tokens, position + 1, depth)
+            bitset = bitset | right
+        return position, bitset
+
+    def _parse_and(self, tokens, position, depth):
+        """Evaluates terms joined by AND, or simply written one after the
+        other."""
+        position, bitset = self._parse_not(tokens, position, depth)
+        while position < len(tokens) and tokens[position] not in ("OR", ")"):
+            if tokens[position] == "AND":
+                position += 1
+            position, right = self._parse_not(tokens, position, depth)
+            bitset = bitset & right
+        return position, bitset
+
+    def _parse_not(self, tokens, position, depth):
+        """Evaluates a tag or a parenthesized query, after any NOTs."""
+        negated = False
+        while position < len(tokens) and tokens[position] == "NOT":
+            negated = not negated
+            position += 1
+        if position == len(tokens):
+            raise ValueError("the query ends too early")
+
+        token = tokens[position]
+        if token == "(":
+            if depth == MAX_QUERY_DEPTH:
+                raise ValueError("query nested too deeply")
+            position, bitset = self._parse_or(tokens, position + 1, depth + 1)
+            if position == len(tokens) or tokens[position] != ")":
+                raise ValueError("missing )")
+            position += 1
+        elif token.startswith("#"):
+            bitset = self._bitsets.get(token, self._empty)
+            position += 1
+        else:
+            raise ValueError("unexpected " + token)
+
+        if negated:
+            bitset = ~bitset & self._all
+        return position, bitset
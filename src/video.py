@@ -1,78 +1,244 @@
 """A video class."""
 
+from .moderation import ModerationStore
+from array import array
 from typing import Sequence
+import sys
+
+
+class TagDictionary:
+    """A class used to represent the catalog-wide dictionary of tags.
+
+    Every distinct tag is stored once and given a small integer id, in the
+    order the tags are first seen.
+    """
+
+    def __init__(self, names=()):
+        """TagDictionary constructor."""
+        self._names = []
+        self._ids = {}
+        for name in names:
+            self.tag_id(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def names(self) -> list:
+        """Returns every tag, indexed by tag id."""
+        return self._names
+
+    def tag_id(self, tag: str) -> int:
+        """Returns the id of a tag, adding the tag if it is new."""
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            tag_id = self._ids[tag] = len(self._names)
+            self._names.append(sys.intern(tag))
+        return tag_id
+
+    def name(self, tag_id: int) -> str:
+        """Returns the tag with the given id."""
+        return self._names[tag_id]
+
+
+class VideoColumns:
+    """A class used to represent the columns of a video catalog.
+
+    Each video is a row number. Titles and video ids are kept in lists of
+    interned strings, the tags of every video as ids from a TagDictionary
+    in one flat array indexed by an array of row offsets. The columns only
+    hold catalog data, which never changes once appended: moderation state
+    lives in a ModerationStore and playback state in each session, so one
+    set of columns can be shared by any number of sessions.
+
+    The "title (video_id) [tags]" line each video is displayed with is
+    built the first time it is needed and kept.
+
+    Rows are only ever appended; a row dropped by the library simply stops
+    being referenced.
+    """
+
+    def __init__(self):
+        """VideoColumns constructor."""
+        self._titles = []
+        self._video_ids = []
+        self._tag_offsets = array("L", [0])
+        self._tag_dictionary = TagDictionary()
+        self._tags = array("I")
+        self._display_lines = {}
+
+    def __len__(self):
+        return len(self._video_ids)
+
+    def append(self, video_title: str, video_id: str,
+               video_tags: Sequence[str]) -> int:
+        """Adds a video to the columns.
+
+        Returns:
+            The row number of the new video.
+        """
+        row = len(self._video_ids)
+        self._titles.append(sys.intern(video_title))
+        self._video_ids.append(sys.intern(video_id))
+        tag_id = self._tag_dictionary.tag_id
+        self._tags.extend(tag_id(tag) for tag in video_tags)
+        self._tag_offsets.append(len(self._tags))
+        return row
+
+    def extend(self, other: "VideoColumns"):
+        """Appends every row of other, in order.
+
+        The tag ids of the new rows are translated to this columns' tag
+        dictionary.
+        """
+        tag_id = self._tag_dictionary.tag_id
+        mapping = [tag_id(name) for name in other._tag_dictionary.names]
+        base = len(self._tags)
+        self._titles.extend(other._titles)
+        self._video_ids.extend(other._video_ids)
+        self._tag_offsets.extend(base + offset
+                                 for offset in other._tag_offsets[1:])
+        if mapping == list(range(len(mapping))):
+            self._tags.extend(other._tags)
+        else:
+            self._tags.extend(map(mapping.__getitem__, other._tags))
+
+    @property
+    def video_ids(self) -> list:
+        """Returns the video id of every row, in row order."""
+        return self._video_ids
+
+    @property
+    def tag_dictionary(self) -> TagDictionary:
+        """Returns the dictionary the tag ids of every row refer to."""
+        return self._tag_dictionary
+
+    def video(self, row: int, moderation: ModerationStore) -> "Video":
+        """Returns a Video view over one row.
+
+        Args:
+            row: The row of the video.
+            moderation: The ModerationStore the video's flag is kept in.
+        """
+        video = Video.__new__(Video)
+        video._columns = self
+        video._row = row
+        video._moderation = moderation
+        return video
+
+    def title(self, row: int) -> str:
+        """Returns the title of the video in a row."""
+        return self._titles[row]
+
+    def video_id(self, row: int) -> str:
+        """Returns the video id of the video in a row."""
+        return self._video_ids[row]
+
+    def tags(self, row: int) -> tuple:
+        """Returns the tags of the video in a row."""
+        names = self._tag_dictionary.names
+        return tuple(names[tag_id] for tag_id in self.tag_ids(row))
+
+    def tag_ids(self, row: int) -> array:
+        """Returns the tag ids of the video in a row."""
+        return self._tags[self._tag_offsets[row]:self._tag_offsets[row + 1]]
+
+    def to_snapshot(self):
+        """Returns the catalog columns as a marshal-friendly tuple."""
+        return (self._titles, self._video_ids, self._tag_offsets.tobytes(),
+                self._tags.tobytes(), self._tag_dictionary.names)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Rebuilds the columns from a tuple returned by to_snapshot."""
+        titles, video_ids, tag_offsets, tags, tag_names = snapshot
+        columns = cls()
+        columns._titles = [sys.intern(title) for title in titles]
+        columns._video_ids = [sys.intern(video_id) for video_id in video_ids]
+        columns._tag_offsets = array("L")
+        columns._tag_offsets.frombytes(tag_offsets)
+        columns._tags = array("I")
+        columns._tags.frombytes(tags)
+        columns._tag_dictionary = TagDictionary(tag_names)
+        if (len(columns._tag_offsets) != len(video_ids) + 1
+                or columns._tag_offsets[-1] != len(columns._tags)):
+            raise ValueError("Snapshot tag offsets do not match its rows")
+        return columns
 
 
 class Video:
-    """A class used to represent a Video."""
+    """A class used to represent a Video.
+
+    A Video is a lightweight view over one row of VideoColumns; the data
+    itself lives in the columns, so views can be created and dropped
+    freely. Two views of the same row compare equal. Whether a video is
+    flagged is looked up in the ModerationStore the view was created with.
+    """
+
+    __slots__ = ("_columns", "_row", "_moderation")
 
     def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str]):
-        """Video constructor."""
-        self._title = video_title
-        self._video_id = video_id
-        self._playing = False
-        self._paused = False
-        self._flagged = False
-        self._reason = ""
-
-        # Turn the tags into a tuple here so it's unmodifiable,
-        # in case the caller changes the 'video_tags' they passed to us
-        self._tags = tuple(video_tags)
+        """Video constructor.
+
+        Creates a standalone video backed by columns and a moderation
+        store of its own.
+        """
+        # The tags are copied into the columns here, so the video is
+        # unaffected if the caller changes the 'video_tags' they passed to us
+        self._columns = VideoColumns()
+        self._row = self._columns.append(video_title, video_id, video_tags)
+        self._moderation = ModerationStore()
+
+    def __eq__(self, other):
+        if not isinstance(other, Video):
+            return NotImplemented
+        return self._columns is other._columns and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._columns), self._row))
 
     @property
     def title(self) -> str:
         """Returns the title of a video."""
-        return self._title
+        return self._columns._titles[self._row]
 
     @property
     def video_id(self) -> str:
         """Returns the video id of a video."""
-        return self._video_id
+        return self._columns._video_ids[self._row]
 
     @property
     def tags(self) -> Sequence[str]:
         """Returns the list of tags of a video."""
-        return self._tags
+        return self._columns.tags(self._row)
 
     @property
-    def playing(self) -> bool:
-        """Returns a boolean if video is playing."""
-        return self._playing
+    def tag_ids(self) -> Sequence[int]:
+        """Returns the ids of the tags of a video in its TagDictionary."""
+        return self._columns.tag_ids(self._row)
 
     @property
-    def paused(self) -> bool:
-        """Returns a boolean if video is playing."""
-        return self._paused
+    def display_line(self) -> str:
+        """Returns the "title (video_id) [tags]" line of a video."""
+        line = self._columns._display_lines.get(self._row)
+        if line is None:
+            line = self.title + " (" + self.video_id + ") [" + " ".join(self.tags) + "]"
+            self._columns._display_lines[self._row] = line
+        return line
+
+    @property
+    def listing_line(self) -> str:
+        """Returns the display line of a video, marked if it is flagged."""
+        if not self.flagged:
+            return self.display_line
+        return self._moderation.listing_line(self.video_id, self.display_line)
 
     @property
     def flagged(self) -> bool:
         """Returns a boolean if video is flagged."""
-        return self._flagged
+        return self._moderation.is_flagged(self.video_id)
 
     @property
     def reason(self) -> str:
         """Returns reason when flagged."""
-        return self._reason
-
-    def switch_playing_state(self):
-        """Switches video playing state between playing and stopped."""
-        if self._playing:
-            self._playing = False
-        else:
-            self._playing = True
-
-    def switch_paused_state(self):
-        """Switches video paused state between paused and playing."""
-        if self._paused:
-            self._paused = False
-        else:
-            self._paused = True
-
-    def switch_flagged_state(self, reason: str):
-        """Switches video flagged state between flagged and not flagged."""
-        if self._flagged:
-            self._flagged = False
-        else:
-            self._flagged = True
-
-        self._reason = reason
+        return self._moderation.reason(self.video_id)
@@ -1,36 +1,316 @@
 """A video library class."""
 
-from .video import Video
+from .video import VideoColumns
+from .moderation import ModerationStore
+from .catalog_loader import LazyRows, load_catalogs, resolve_sources
+from .search_index import TagIndex, TitleIndex, complete_sorted, remove_sorted
+from .ranked_index import RankedIndex, tokenize
+from .fuzzy_index import FuzzyIndex
+from .search_cache import SearchCache
+from .tag_bitsets import TagBitsets
+from .video_pool import VideoPool
+from .rwlock import ReadWriteLock
+from bisect import insort
+from itertools import islice
 from pathlib import Path
-import csv
+import random
+import threading
 
-
-# Helper Wrapper around CSV reader to strip whitespace from around
-# each item.
-def _csv_reader_with_strip(reader):
-    yield from ((item.strip() for item in line) for line in reader)
+# Largest search result, in videos, kept in the search cache.
+MAX_CACHED_RESULTS = 1000
 
 
 class VideoLibrary:
-    """A class used to represent a Video Library."""
-
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
-        self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(
-                csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+    """A class used to represent a Video Library.
+
+    The library holds the catalog and which videos are flagged; it keeps no
+    playback state, so any number of players can share one library.
+
+    The library does not lock itself: callers sharing it between threads
+    hold its lock for reading while they only look videos up and for
+    writing while they add, remove, flag or allow videos. The rows and
+    indexes a lazy library fills in on first use are guarded internally,
+    so readers may do so concurrently.
+    """
+
+    def __init__(self, sources=None, lazy=False, snapshot=True,
+                 workers=None, search_cache_size=256, suggestions=False):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            sources: Path or glob pattern of the pipe-delimited catalogs to
+                load, or an iterable of them. Defaults to the videos.txt
+                file shipped next to this module. The catalogs are merged
+                in the order given; a video_id that appears more than once
+                keeps its first row and is reported by
+                duplicate_video_ids.
+            lazy: If True, the catalogs are memory-mapped and only an index
+                from video_id to line offset is built up front. Rows are
+                parsed into the columns the first time they are looked up,
+                and the search indexes are built on the first search.
+            snapshot: If True, a library that is not lazy loads each
+                catalog from the binary snapshot next to it while the
+                snapshot matches the file's size and mtime. Otherwise it
+                parses the file and writes a new snapshot.
+            workers: Number of processes parsing catalogs when more than
+                one needs parsing. Defaults to the number of processors.
+            search_cache_size: The most search results to cache. 0
+                disables the cache.
+            suggestions: If True, the indexes behind suggest_video_ids
+                and suggest_title_words are built as the catalogs are
+                loaded, which for a million videos takes about 30 s and
+                900 MB. Otherwise nothing is ever suggested.
+        """
+        if sources is None:
+            sources = Path(__file__).parent / "videos.txt"
+        self._sources = sources
+        self._lazy = lazy
+        self._snapshot = snapshot
+        self._workers = workers
+        self._suggestions = suggestions
+
+        self._moderation = ModerationStore()
+        self._lock = ReadWriteLock()
+        self._index_lock = threading.Lock()
+        # Bumped whenever search results may change, which invalidates
+        # every cached result.
+        self._generation = 0
+        self._search_cache = SearchCache(search_cache_size)
+        self._load()
+
+    def _load(self):
+        """Loads the catalogs and builds everything derived from them."""
+        video_files = resolve_sources(self._sources)
+        if self._lazy:
+            self._columns = VideoColumns()
+            self._rows = LazyRows(video_files, self._columns)
+            self._duplicate_ids = sorted(self._rows.duplicate_video_ids)
+        else:
+            self._columns = load_catalogs(video_files, self._snapshot,
+                                          self._workers)
+            video_ids = self._columns.video_ids
+            self._rows = dict(zip(video_ids, range(len(video_ids))))
+            self._duplicate_ids = []
+            if len(self._rows) != len(video_ids):
+                self._keep_first_rows(video_ids)
+
+        # Orderings used by listings, built once here and then maintained
+        # by add_video/remove_video so no command has to sort the catalog.
+        self._sorted_ids = sorted(self._rows)
+        self._sorted_titles = None
+        self._title_index = None
+        self._tag_index = None
+        # Only built by the first ranked search.
+        self._ranked_index = None
+        # Only built with suggestions on: a FuzzyIndex of video ids, a
+        # FuzzyIndex of the words of unflagged titles and how many of
+        # those titles use each word.
+        self._fuzzy_indexes = None
+        # Only built by the first tag query; ordinals are positions in
+        # _sorted_ids, so adding or removing a video drops it.
+        self._tag_bitsets = None
+        # The unflagged video ids, only gathered by the first random pick.
+        self._random_pool = None
+        if not self._lazy:
+            self._build_indexes()
+        if self._suggestions:
+            self._build_fuzzy_indexes()
+
+    def reload(self):
+        """Loads the catalogs again, picking up any changes to them.
+
+        Videos keep their flags; flags of videos no longer in the catalogs
+        are dropped.
+        """
+        self._load()
+        for video_id in list(self._moderation.flagged_video_ids()):
+            if video_id not in self._rows:
+                self._moderation.allow(video_id)
+        self._generation += 1
+
+    def _keep_first_rows(self, video_ids):
+        """Points every repeated video_id back at its first row."""
+        duplicates = set()
+        for row in range(len(video_ids) - 1, -1, -1):
+            video_id = video_ids[row]
+            if self._rows[video_id] != row:
+                duplicates.add(video_id)
+                self._rows[video_id] = row
+        self._duplicate_ids = sorted(duplicates)
+
+    def _catalog_rows(self):
+        """Returns (video_id, title, tag_ids, flagged) for every video."""
+        if isinstance(self._rows, LazyRows):
+            rows = self._rows.rows()
+        else:
+            columns = self._columns
+            rows = ((video_id, columns.title(row), columns.tag_ids(row))
+                    for video_id, row in self._rows.items())
+
+        flagged = self._moderation.is_flagged
+        return [(video_id, title, tag_ids, flagged(video_id))
+                for video_id, title, tag_ids in rows]
+
+    def _build_indexes(self):
+        """Builds the search indexes and the by-title ordering."""
+        rows = self._catalog_rows()
+        self._sorted_titles = sorted((title, video_id)
+                                     for video_id, title, _, _ in rows)
+        tag_index = TagIndex(self._columns.tag_dictionary)
+        tag_index.add_all((video_id, tag_ids)
+                          for video_id, _, tag_ids, flagged in rows
+                          if not flagged)
+        self._tag_index = tag_index
+        # Set last: _indexes_built() reports the indexes ready once it is.
+        title_index = TitleIndex()
+        title_index.add_all((video_id, title)
+                            for video_id, title, _, flagged in rows
+                            if not flagged)
+        self._title_index = title_index
+
+    def _ensure_indexes(self):
+        """Builds the search indexes unless they already exist.
+
+        Readers of a lazy library may get here at the same time; only
+        one of them builds the indexes.
+        """
+        if self._indexes_built():
+            return
+        with self._index_lock:
+            if not self._indexes_built():
+                self._build_indexes()
+
+    def _ensure_ranked_index(self):
+        """Builds the ranked search index unless it already exists."""
+        if self._ranked_index is not None:
+            return
+        with self._index_lock:
+            if self._ranked_index is not None:
+                return
+            names = self._columns.tag_dictionary.names
+            ranked_index = RankedIndex()
+            for video_id, title, tag_ids, flagged in self._catalog_rows():
+                if not flagged:
+                    ranked_index.add(video_id, title,
+                                     [names[tag_id] for tag_id in tag_ids])
+            self._ranked_index = ranked_index
+
+    def _build_fuzzy_indexes(self):
+        """Builds the indexes used for suggestions."""
+        video_ids = []
+        title_words = {}
+        for video_id, title, _, flagged in self._catalog_rows():
+            video_ids.append(video_id)
+            if not flagged:
+                for word in set(tokenize(title)):
+                    title_words[word] = title_words.get(word, 0) + 1
+        self._fuzzy_indexes = (FuzzyIndex(video_ids), FuzzyIndex(title_words),
+                               title_words)
+
+    def _change_fuzzy_indexes(self, change, value):
+        """Applies a change to the suggestion indexes, if they are built.
+
+        Args:
+            change: "add id", "remove id", "add title" or "remove title".
+                Titles are only indexed while their video is unflagged.
+            value: The video id or title.
+        """
+        if self._fuzzy_indexes is None:
+            return
+        fuzzy_ids, fuzzy_words, title_words = self._fuzzy_indexes
+        if change == "add id":
+            fuzzy_ids.add(value)
+        elif change == "remove id":
+            fuzzy_ids.remove(value)
+        elif change == "add title":
+            for word in set(tokenize(value)):
+                count = title_words.get(word, 0)
+                title_words[word] = count + 1
+                if not count:
+                    fuzzy_words.add(word)
+        else:
+            for word in set(tokenize(value)):
+                count = title_words.pop(word) - 1
+                if count:
+                    title_words[word] = count
+                else:
+                    fuzzy_words.remove(word)
+
+    def _ensure_tag_bitsets(self):
+        """Builds the bitsets used for tag queries unless they exist."""
+        if self._tag_bitsets is not None:
+            return
+        with self._index_lock:
+            if self._tag_bitsets is not None:
+                return
+            rows = self._rows
+            tag_ids = self._columns.tag_ids
+            flagged = self._moderation.is_flagged
+            self._tag_bitsets = TagBitsets(
+                self._sorted_ids, self._columns.tag_dictionary.names,
+                ((ordinal, tag_ids(rows[video_id]), flagged(video_id))
+                 for ordinal, video_id in enumerate(self._sorted_ids)))
+
+    def _ensure_random_pool(self):
+        """Gathers the unflagged video ids unless they already are."""
+        if self._random_pool is not None:
+            return
+        with self._index_lock:
+            if self._random_pool is not None:
+                return
+            flagged = self._moderation.is_flagged
+            self._random_pool = VideoPool(
+                video_id for video_id in self._sorted_ids
+                if not flagged(video_id))
+
+    def _indexes_built(self):
+        """Returns True once the search indexes exist.
+
+        A lazy library only builds them when they are first needed.
+        """
+        return self._title_index is not None
+
+    def _video(self, video_id):
+        """Returns the Video view for a video_id known to be in the library."""
+        return self._columns.video(self._rows[video_id], self._moderation)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def duplicate_video_ids(self) -> list:
+        """Returns the sorted ids of videos found in more than one row."""
+        return self._duplicate_ids
+
+    @property
+    def lock(self):
+        """Returns the ReadWriteLock guarding the library."""
+        return self._lock
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
-        return list(self._videos.values())
+        video = self._columns.video
+        moderation = self._moderation
+        return [video(row, moderation) for row in self._rows.values()]
+
+    def get_random_video(self, rng=None):
+        """Returns an unflagged video picked uniformly at random.
+
+        Picking takes constant time: the unflagged video ids are gathered
+        the first time and then kept up to date.
+
+        Args:
+            rng: The random.Random to pick with, so picks can be
+                reproduced. Defaults to the random module's generator.
+
+        Returns:
+            The Video object picked. None if every video is flagged.
+        """
+        self._ensure_random_pool()
+        video_id = self._random_pool.choice(rng if rng is not None else random)
+        if video_id is None:
+            return None
+        return self._video(video_id)
 
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
@@ -42,4 +322,339 @@ class VideoLibrary:
             The Video object for the requested video_id. None if the video
             does not exist.
         """
-        return self._videos.get(video_id, None)
+        if video_id not in self._rows:
+            return None
+        return self._video(video_id)
+
+    def get_videos_sorted_by_id(self):
+        """Yields every video in the library ordered by video_id."""
+        for video_id in self._sorted_ids:
+            yield self._video(video_id)
+
+    def get_videos_sorted_by_title(self):
+        """Yields every video in the library ordered by title.
+
+        Videos sharing a title are ordered by video_id.
+        """
+        self._ensure_indexes()
+
+        for _, video_id in self._sorted_titles:
+            yield self._video(video_id)
+
+    def add_video(self, video):
+        """Adds a copy of a video to the library.
+
+        Any video with the same id is replaced. The copy is flagged if the
+        video is.
+
+        Args:
+            video: The Video object to add.
+        """
+        self.remove_video(video.video_id)
+
+        self._generation += 1
+        self._rows[video.video_id] = self._columns.append(
+            video.title, video.video_id, video.tags)
+        if video.flagged:
+            self._moderation.flag(video.video_id, video.reason)
+        insort(self._sorted_ids, video.video_id)
+        self._tag_bitsets = None
+        self._change_fuzzy_indexes("add id", video.video_id)
+        if not video.flagged:
+            self._change_fuzzy_indexes("add title", video.title)
+        if self._random_pool is not None and not video.flagged:
+            self._random_pool.add(video.video_id)
+        if self._ranked_index is not None and not video.flagged:
+            self._ranked_index.add(video.video_id, video.title, video.tags)
+        if not self._indexes_built():
+            return
+
+        insort(self._sorted_titles, (video.title, video.video_id))
+        if not video.flagged:
+            self._title_index.add(video.video_id, video.title)
+            self._tag_index.add(video.video_id,
+                                self._video(video.video_id).tag_ids)
+
+    def remove_video(self, video_id):
+        """Removes a video from the library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The removed Video object. None if the video does not exist.
+        """
+        if video_id not in self._rows:
+            return None
+        self._generation += 1
+        # The removed video keeps its flag in a store of its own.
+        moderation = ModerationStore()
+        flagged = self._moderation.is_flagged(video_id)
+        if flagged:
+            moderation.flag(video_id, self._moderation.reason(video_id))
+            self._moderation.allow(video_id)
+        video = self._columns.video(self._rows.pop(video_id), moderation)
+
+        remove_sorted(self._sorted_ids, video_id)
+        self._tag_bitsets = None
+        self._change_fuzzy_indexes("remove id", video_id)
+        if not flagged:
+            self._change_fuzzy_indexes("remove title", video.title)
+        if self._random_pool is not None:
+            self._random_pool.remove(video_id)
+        if self._ranked_index is not None:
+            self._ranked_index.remove(video_id)
+        if not self._indexes_built():
+            return video
+
+        remove_sorted(self._sorted_titles, (video.title, video_id))
+        self._title_index.remove(video_id)
+        self._tag_index.remove(video_id)
+        return video
+
+    def iter_search_videos(self, search_term, limit=None, cached=True):
+        """Yields the unflagged videos whose title contains the search_term.
+
+        Videos are found as they are consumed, so memory stays bounded
+        however many videos match, and a limit stops the search as soon
+        as enough are found. Results of up to MAX_CACHED_RESULTS videos
+        are cached by search term. The library must not change while the
+        generator is in use.
+
+        Args:
+            search_term: The query to be used in search, matched without
+                regard to case.
+            limit: The most videos to yield. None for no limit.
+            cached: If False, the search runs without the cache, neither
+                looked up nor filled.
+
+        Yields:
+            Video objects, ordered by video_id.
+        """
+        self._ensure_indexes()
+        key = ("title", search_term.lower(), limit)
+        return self._cached_search(key, lambda: islice(
+            self._title_index.iter_search(search_term), limit), cached)
+
+    def search_videos(self, search_term, limit=None):
+        """Returns the unflagged videos whose title contains the search_term.
+
+        Args:
+            search_term: The query to be used in search, matched without
+                regard to case.
+            limit: The most videos to return. None for no limit.
+
+        Returns:
+            A list of Video objects sorted by video_id.
+        """
+        return list(self.iter_search_videos(search_term, limit))
+
+    def iter_search_videos_with_tag(self, video_tag, exact=False,
+                                    limit=None, cached=True):
+        """Yields the unflagged videos whose tags match the video_tag.
+
+        Like iter_search_videos, videos are found as they are consumed
+        and small results are cached.
+
+        Args:
+            video_tag: The video tag to be used in search.
+            exact: If True, a video must carry exactly this tag. Otherwise
+                any of its tags may merely contain video_tag.
+            limit: The most videos to yield. None for no limit.
+            cached: If False, the search runs without the cache.
+
+        Yields:
+            Video objects, ordered by video_id.
+        """
+        self._ensure_indexes()
+        key = ("tag", video_tag.lower(), exact, limit)
+        return self._cached_search(key, lambda: islice(
+            self._tag_index.iter_search(video_tag, exact), limit), cached)
+
+    def search_videos_with_tag(self, video_tag, exact=False, limit=None):
+        """Returns the unflagged videos whose tags match the video_tag.
+
+        Args:
+            video_tag: The video tag to be used in search.
+            exact: If True, a video must carry exactly this tag. Otherwise
+                any of its tags may merely contain video_tag.
+            limit: The most videos to return. None for no limit.
+
+        Returns:
+            A list of Video objects sorted by video_id.
+        """
+        return list(self.iter_search_videos_with_tag(video_tag, exact, limit))
+
+    def search_videos_with_tag_query(self, tag_query, limit=None):
+        """Returns the unflagged videos matching a boolean tag query.
+
+        Tags are combined with AND, OR and NOT and grouped with
+        parentheses, as in "#cat AND #animal NOT #dog"; a tag matches
+        videos carrying exactly that tag, without regard to case. The
+        query is evaluated on one bitset per tag, built the first time it
+        is needed.
+
+        Args:
+            tag_query: The query to evaluate.
+            limit: The most videos to return. None for no limit.
+
+        Returns:
+            A list of Video objects sorted by video_id.
+
+        Raises:
+            ValueError: If the query is malformed.
+        """
+        self._ensure_tag_bitsets()
+        key = ("tag query", " ".join(tag_query.lower().split()), limit)
+        return list(self._cached_search(key, lambda: iter(
+            self._tag_bitsets.query(tag_query, limit))))
+
+    def search_videos_ranked(self, query, limit=10):
+        """Returns the unflagged videos most relevant to a query.
+
+        Titles and tags are ranked with BM25. The ranked index is built
+        the first time it is needed.
+
+        Args:
+            query: Words to look for, separated by anything that is not a
+                letter or digit.
+            limit: The most videos to return.
+
+        Returns:
+            A list of Video objects, most relevant first.
+        """
+        self._ensure_ranked_index()
+        key = ("ranked", tuple(sorted(set(tokenize(query)))), limit)
+        return list(self._cached_search(key, lambda: (
+            video_id
+            for video_id, _ in self._ranked_index.search(query, limit))))
+
+    def _cached_search(self, key, search, cached=True):
+        """Yields the videos of a search, from the cache when possible.
+
+        Args:
+            key: The normalized search, as cached.
+            search: A function returning an iterator over the video ids
+                found, run on a cache miss.
+            cached: If False, search is run without touching the cache.
+        """
+        if not cached:
+            return map(self._video, search())
+        generation = self._generation
+        video_ids = self._search_cache.get(key, generation)
+        if video_ids is not None:
+            return map(self._video, video_ids)
+        return self._search_and_cache(key, generation, search())
+
+    def _search_and_cache(self, key, generation, video_ids):
+        """Yields the videos of a search and caches it if it is small."""
+        found = []
+        for video_id in video_ids:
+            if found is not None:
+                found.append(video_id)
+                if len(found) > MAX_CACHED_RESULTS:
+                    found = None
+            yield self._video(video_id)
+        if found is not None:
+            self._search_cache.put(key, generation, tuple(found))
+
+    def search_cache_stats(self):
+        """Returns the CacheStats of the search result cache."""
+        return self._search_cache.stats()
+
+    def complete_video_ids(self, prefix, limit=10):
+        """Returns the video ids in the library starting with a prefix.
+
+        Args:
+            prefix: The start of a video url, matched with case.
+            limit: The most ids to return.
+
+        Returns:
+            A sorted list of video ids.
+        """
+        return complete_sorted(self._sorted_ids, prefix, limit)
+
+    def suggest_video_ids(self, video_id, limit=3):
+        """Returns the video ids in the library within one edit of video_id.
+
+        Meant for a video_id that was not found, such as a typo. Nothing
+        is suggested unless the library was created with suggestions on.
+
+        Args:
+            video_id: The video url that was looked up.
+            limit: The most ids to return.
+
+        Returns:
+            A sorted list of video ids.
+        """
+        if self._fuzzy_indexes is None:
+            return []
+        return self._fuzzy_indexes[0].lookup(video_id, limit)
+
+    def suggest_title_words(self, word, limit=3):
+        """Returns other words used in titles within one edit of a word.
+
+        Only titles of unflagged videos, which searches can find, count.
+        Like suggest_video_ids, nothing is suggested unless the library
+        was created with suggestions on.
+
+        Args:
+            word: The word that found nothing, matched without regard to
+                case.
+            limit: The most words to return.
+
+        Returns:
+            A sorted list of lower-case words.
+        """
+        if self._fuzzy_indexes is None:
+            return []
+        word = word.lower()
+        fuzzy_words = self._fuzzy_indexes[1]
+        return [match for match in fuzzy_words.lookup(word, limit + 1)
+                if match != word][:limit]
+
+    def flag_video(self, video_id, reason):
+        """Marks a video as flagged and hides it from searches.
+
+        Args:
+            video_id: The video url.
+            reason: Reason for flagging the video.
+        """
+        if not self._moderation.is_flagged(video_id):
+            self._moderation.flag(video_id, reason)
+            self._generation += 1
+            if video_id in self._rows:
+                self._change_fuzzy_indexes(
+                    "remove title", self._video(video_id).title)
+            if self._tag_bitsets is not None:
+                self._tag_bitsets.set_flagged(video_id, True)
+            if self._random_pool is not None:
+                self._random_pool.remove(video_id)
+            if self._ranked_index is not None:
+                self._ranked_index.remove(video_id)
+            if not self._indexes_built():
+                return
+            self._title_index.remove(video_id)
+            self._tag_index.remove(video_id)
+
+    def allow_video(self, video_id):
+        """Removes the flag from a video and makes it searchable again.
+
+        Args:
+            video_id: The video url.
+        """
+        if self._moderation.is_flagged(video_id):
+            self._moderation.allow(video_id)
+            self._generation += 1
+            video = self._video(video_id)
+            self._change_fuzzy_indexes("add title", video.title)
+            if self._tag_bitsets is not None:
+                self._tag_bitsets.set_flagged(video_id, False)
+            if self._random_pool is not None:
+                self._random_pool.add(video_id)
+            if self._ranked_index is not None:
+                self._ranked_index.add(video_id, video.title, video.tags)
+            if not self._indexes_built():
+                return
+            self._title_index.add(video_id, video.title)
+            self._tag_index.add(video_id, video.tag_ids)
@@ -2,45 +2,82 @@
 
 from .video_library import VideoLibrary
 from .video_playlist import Playlist
-import random
+from .output_sink import StdoutSink
+from .playback import PAUSED, PLAYING, STOPPED, PlaybackState
+from .rwlock import ReadWriteLock
+from itertools import chain, islice
+
 
 class VideoPlayer:
-    """A class used to represent a Video Player."""
+    """A class used to represent a Video Player.
 
-    def __init__(self):
-        self._video_library = VideoLibrary()
-        self._playlist_library = Playlist()
+    Playback state and playlists belong to the player; the catalog and
+    the flags on its videos belong to the VideoLibrary, which many players
+    can share.
+    """
 
-    def number_of_videos(self):
-        num_videos = len(self._video_library.get_all_videos())
-        print(f"{num_videos} videos in the library")
+    def __init__(self, video_library=None, interactive=True, output=None,
+                 rng=None):
+        """VideoPlayer constructor.
 
-    def show_all_videos(self):
-        """Returns all videos."""
-        print("Here's a list of all available videos:")
+        Args:
+            video_library: The VideoLibrary to play from, possibly shared
+                with other players. A new one is loaded from videos.txt if
+                not given.
+            interactive: If False, the questions asked after a search are
+                still printed but never read from input; the answer is
+                always taken to be no.
+            output: The OutputSink results are written to. Defaults to
+                standard output.
+            rng: The random.Random PLAY_RANDOM picks videos with; seed it
+                to make the picks reproducible. Defaults to the random
+                module's generator.
+        """
+        if video_library is None:
+            video_library = VideoLibrary()
+        self._video_library = video_library
+        self._playlist_library = Playlist()
+        self._playback = PlaybackState()
+        self._lock = ReadWriteLock()
+        self._interactive = interactive
+        self._output = output if output is not None else StdoutSink()
+        self._rng = rng
+
+    @property
+    def video_library(self):
+        """Returns the VideoLibrary the player plays from."""
+        return self._video_library
+
+    @property
+    def lock(self):
+        """Returns the ReadWriteLock guarding playback and playlists.
+
+        The player does not take it itself; CommandParser does.
+        """
+        return self._lock
 
-        videos_list = self._video_library.get_all_videos()
-        videos_id_list = []
+    @property
+    def output(self):
+        """Returns the OutputSink the player writes to."""
+        return self._output
 
-        for video in videos_list:
-            videos_id_list.append(video.video_id)
+    def number_of_videos(self):
+        num_videos = len(self._video_library)
+        self._output.write_line(f"{num_videos} videos in the library")
 
-        for sorted_video_id in sorted(videos_id_list):
-            sorted_video = self._video_library.get_video(sorted_video_id)
-            sorted_video_tags = sorted_video.tags
-            sorted_video_tags_concatenated = ""
-            count = 0
+    def show_search_cache(self):
+        """Displays how well the library's search cache is doing."""
+        stats = self._video_library.search_cache_stats()
+        self._output.write_line(
+            "Search cache: " + str(stats.hits) + " hits, " + str(stats.misses) + " misses ("
+            + format(stats.hit_ratio, ".1%") + " hit ratio), " + str(stats.evictions)
+            + " evictions, " + str(stats.size) + " cached results")
 
-            for tag in sorted_video_tags:
-                count += 1
-                sorted_video_tags_concatenated += tag
-                if count != len(sorted_video_tags):
-                    sorted_video_tags_concatenated += " "
+    def show_all_videos(self):
+        """Returns all videos."""
+        self._output.write_line("Here's a list of all available videos:")
 
-            if self._video_library.get_video(sorted_video_id).flagged:
-                print(" " + sorted_video.title + " (" + sorted_video.video_id + ")" + " [" + sorted_video_tags_concatenated + "] - FLAGGED (reason: " + self._video_library.get_video(sorted_video_id).reason + ")")
-            else:
-                print(" " + sorted_video.title + " (" + sorted_video.video_id + ")" + " [" + sorted_video_tags_concatenated + "]")
+        self._output.write_lines(self._video_lines(self._video_library.get_videos_sorted_by_id()))
 
     def play_video(self, video_id):
         """Plays the respective video.
@@ -49,142 +86,98 @@ class VideoPlayer:
             video_id: The video_id to be played.
         """
 
-        videos_list = self._video_library.get_all_videos()
-
-        video_id_found = False
-        for video in videos_list:
-            if video.video_id == video_id:
-                video_id_found = True
-
-        if video_id_found:
-            if not self._video_library.get_video(video_id).flagged:
-                for video in videos_list:
-                    if video.playing:
-                        video.switch_playing_state()
-                        print("Stopping video: " + video.title)
-
-                    if video.paused:
-                        video.switch_paused_state()
-                        print("Stopping video: " + video.title)
+        video = self._video_library.get_video(video_id)
 
-                print("Playing video: " + self._video_library.get_video(video_id).title)
-                self._video_library.get_video(video_id).switch_playing_state()
+        if video is None:
+            self._output.write_line("Cannot play video: Video does not exist")
+            self._suggest_video_ids(video_id)
 
-            else:
-                print("Cannot play video: Video is currently flagged (reason: " + self._video_library.get_video(video_id).reason + ")")
+        elif video.flagged:
+            self._output.write_line("Cannot play video: Video is currently flagged (reason: " + video.reason + ")")
 
         else:
-            print("Cannot play video: Video does not exist")
+            self._stop_current_video()
+            self._start_video(video)
 
     def stop_video(self):
         """Stops the current video."""
 
-        videos_list = self._video_library.get_all_videos()
-
-        video_was_playing = False
-        for video in videos_list:
-            if video.playing:
-                video.switch_playing_state()
-                video_was_playing = True
-                print("Stopping video: " + video.title)
-
-            if video.paused:
-                video.switch_paused_state()
-                video_was_playing = True
-                print("Stopping video: " + video.title)
-
-        if not video_was_playing:
-            print("Cannot stop video: No video is currently playing")
+        if not self._stop_current_video():
+            self._output.write_line("Cannot stop video: No video is currently playing")
 
     def play_random_video(self):
         """Plays a random video from the video library."""
 
-        videos_list = self._video_library.get_all_videos()
-
-        video_list_unflagged = []
-        for video in videos_list:
-            if not video.flagged:
-                video_list_unflagged.append(video)
+        video = self._video_library.get_random_video(self._rng)
 
-        if len(video_list_unflagged) == 0:
-            print("No videos available")
+        if video is None:
+            self._output.write_line("No videos available")
 
         else:
-            for video in video_list_unflagged:
-                if video.playing:
-                    video.switch_playing_state()
-                    print("Stopping video: " + video.title)
-
-            random_video = random.choice(video_list_unflagged)
-            print("Playing video: " + random_video.title)
-            random_video.switch_playing_state()
+            self._stop_current_video()
+            self._start_video(video)
 
     def pause_video(self):
         """Pauses the current video."""
 
-        videos_list = self._video_library.get_all_videos()
+        video = self._playback.video
 
-        video_was_playing = False
-        for video in videos_list:
-            if video.paused:
-                video_was_playing = True
-                print("Video already paused: " + video.title)
+        if self._playback.state == PAUSED:
+            self._output.write_line("Video already paused: " + video.title)
 
-            if video.playing:
-                video.switch_playing_state()
-                video.switch_paused_state()
-                video_was_playing = True
-                print("Pausing video: " + video.title)
+        elif self._playback.state == PLAYING:
+            self._playback.pause()
+            self._output.write_line("Pausing video: " + video.title)
 
-        if not video_was_playing:
-            print("Cannot pause video: No video is currently playing")
+        else:
+            self._output.write_line("Cannot pause video: No video is currently playing")
 
     def continue_video(self):
         """Resumes playing the current video."""
 
-        videos_list = self._video_library.get_all_videos()
+        video = self._playback.video
 
-        video_was_paused = False
-        for video in videos_list:
-            if video.playing:
-                video_was_paused = True
-                print("Cannot continue video: Video is not paused")
+        if self._playback.state == PLAYING:
+            self._output.write_line("Cannot continue video: Video is not paused")
 
-            if video.paused:
-                video.switch_paused_state()
-                video.switch_playing_state()
-                video_was_paused = True
-                print("Continuing video: " + video.title)
+        elif self._playback.state == PAUSED:
+            self._playback.resume()
+            self._output.write_line("Continuing video: " + video.title)
 
-        if not video_was_paused:
-            print("Cannot continue video: No video is currently playing")
+        else:
+            self._output.write_line("Cannot continue video: No video is currently playing")
 
     def show_playing(self):
         """Displays video currently playing."""
 
-        videos_list = self._video_library.get_all_videos()
+        video = self._playback.video
 
-        video_was_playing_or_paused = False
-        for video in videos_list:
-            video_tags = video.tags
-            video_tags_concatenated = ""
-            count = 0
-            for tag in video_tags:
-                count += 1
-                video_tags_concatenated += tag
-                if count != len(video_tags):
-                    video_tags_concatenated += " "
+        if self._playback.state == STOPPED:
+            self._output.write_line("No video is currently playing")
 
-            if video.playing:
-                video_was_playing_or_paused = True
-                print("Currently playing: " + video.title + " (" + video.video_id + ")" + " [" + video_tags_concatenated + "]")
+        elif self._playback.state == PAUSED:
+            self._output.write_line("Currently playing: " + video.display_line + " - PAUSED")
 
-            if video.paused:
-                video_was_playing_or_paused = True
-                print("Currently playing: " + video.title + " (" + video.video_id + ")" + " [" + video_tags_concatenated + "] - PAUSED")
+        else:
+            self._output.write_line("Currently playing: " + video.display_line)
 
-        if not video_was_playing_or_paused:
-            print("No video is currently playing")
+    def _start_video(self, video):
+        """Makes the given video the current one, in the playing state."""
+        self._output.write_line("Playing video: " + video.title)
+        self._playback.play(video)
+
+    def _stop_current_video(self):
+        """Stops the current video, if any.
+
+        Returns:
+            True if a video was playing or paused and has been stopped.
+        """
+        video = self._playback.stop()
+        if video is None:
+            return False
+
+        self._output.write_line("Stopping video: " + video.title)
+        return True
 
     def create_playlist(self, playlist_name):
         """Creates a playlist with a given name.
@@ -193,15 +186,12 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
 
-        can_create_playlist = True
-        for playlist_title in self._playlist_library.titles:
-            if playlist_title.lower() == playlist_name.lower():
-                can_create_playlist = False
-                print("Cannot create playlist: A playlist with the same name already exists")
+        if self._playlist_library.has_playlist(playlist_name):
+            self._output.write_line("Cannot create playlist: A playlist with the same name already exists")
 
-        if can_create_playlist:
+        else:
             self._playlist_library.create_playlist(playlist_name)
-            print("Successfully created new playlist: " + playlist_name)
+            self._output.write_line("Successfully created new playlist: " + playlist_name)
 
     def add_to_playlist(self, playlist_name, video_id):
         """Adds a video to a playlist with a given name.
@@ -211,51 +201,68 @@ class VideoPlayer:
             video_id: The video_id to be added.
         """
 
-        playlist_found = False
-        for playlist_title in self._playlist_library.titles:
-            if playlist_title.lower() == playlist_name.lower():
-                playlist_found = True
+        playlist_found = self._playlist_library.has_playlist(playlist_name)
 
-        video_found = False
-        videos_list = self._video_library.get_all_videos()
-        for video in videos_list:
-            if video.video_id == video_id:
-                video_found = True
+        video_found = self._video_library.get_video(video_id) is not None
 
-        video_in_playlist = False
-        if playlist_found:
-            for video in self._playlist_library.get_videos_from_playlist(playlist_name):
-                if video == video_id:
-                    video_in_playlist = True
+        video_in_playlist = playlist_found and self._playlist_library.playlist_contains(playlist_name, video_id)
 
         if not playlist_found:
-            print("Cannot add video to " + playlist_name + ": Playlist does not exist")
+            self._output.write_line("Cannot add video to " + playlist_name + ": Playlist does not exist")
 
         elif not video_found:
-            print("Cannot add video to " + playlist_name + ": Video does not exist")
+            self._output.write_line("Cannot add video to " + playlist_name + ": Video does not exist")
+            self._suggest_video_ids(video_id)
 
         elif video_in_playlist and not self._video_library.get_video(video_id).flagged:
-            print("Cannot add video to " + playlist_name + ": Video already added")
+            self._output.write_line("Cannot add video to " + playlist_name + ": Video already added")
 
         else:
             if not self._video_library.get_video(video_id).flagged:
                 self._playlist_library.add_videos_to_playlist(playlist_name, video_id)
-                print("Added video to " + playlist_name + ": " + self._video_library.get_video(video_id).title)
+                self._output.write_line("Added video to " + playlist_name + ": " + self._video_library.get_video(video_id).title)
 
             else:
-                print("Cannot add video to " + playlist_name + ": Video is currently flagged (reason: " + self._video_library.get_video(video_id).reason + ")")
+                self._output.write_line("Cannot add video to " + playlist_name + ": Video is currently flagged (reason: " + self._video_library.get_video(video_id).reason + ")")
 
     def show_all_playlists(self):
         """Display all playlists."""
 
         if len(self._playlist_library.titles) == 0:
-            print("No playlists exist yet")
+            self._output.write_line("No playlists exist yet")
 
         else:
-            print("Showing all playlists:")
+            self._output.write_line("Showing all playlists:")
+
+            for playlist_title in self._playlist_library.titles:
+                self._output.write_line(" " + playlist_title)
 
-            for playlist_title in sorted(self._playlist_library.titles):
-                print(" " + playlist_title)
+    def completions(self, prefix, limit=10):
+        """Returns the video ids, then playlist titles, starting with prefix.
+
+        Args:
+            prefix: The start of a video_id or playlist name.
+            limit: The most completions to return in total.
+        """
+        video_ids = self._video_library.complete_video_ids(prefix, limit)
+        return video_ids + self._playlist_library.complete(prefix, limit - len(video_ids))
+
+    def show_completions(self, prefix, limit=10):
+        """Display the video ids and playlist names starting with prefix.
+
+        Args:
+            prefix: The start of a video_id or playlist name.
+            limit: The most completions to list.
+        """
+
+        completions = self.completions(prefix, limit)
+
+        if not completions:
+            self._output.write_line("No completions for " + prefix)
+
+        else:
+            self._output.write_line("Completions for " + prefix + ":")
+            self._output.write_lines(" " + completion for completion in completions)
 
     def show_playlist(self, playlist_name):
         """Display all videos in a playlist with a given name.
@@ -264,37 +271,20 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
 
-        playlist_found = False
-        for playlist_title in self._playlist_library.titles:
-            if playlist_title.lower() == playlist_name.lower():
-                playlist_found = True
+        playlist_found = self._playlist_library.has_playlist(playlist_name)
 
         if not playlist_found:
-            print("Cannot show playlist " + playlist_name + ": Playlist does not exist")
+            self._output.write_line("Cannot show playlist " + playlist_name + ": Playlist does not exist")
 
         elif len(self._playlist_library.get_videos_from_playlist(playlist_name)) == 0:
-            print("Showing playlist: " + playlist_name)
-            print(" No videos here yet")
+            self._output.write_line("Showing playlist: " + playlist_name)
+            self._output.write_line(" No videos here yet")
 
         else:
-            print("Showing playlist: " + playlist_name)
+            self._output.write_line("Showing playlist: " + playlist_name)
 
-            for video_title in self._playlist_library.get_videos_from_playlist(playlist_name):
-                video = self._video_library.get_video(video_title)
-                video_tags = video.tags
-                video_tags_concatenated = ""
-                count = 0
-                for tag in video_tags:
-                    count += 1
-                    video_tags_concatenated += tag
-                    if count != len(video_tags):
-                        video_tags_concatenated += " "
-
-                if video.flagged:
-                    print(" " + video.title + " (" + video.video_id + ")" + " [" + video_tags_concatenated + "] - FLAGGED (reason: " + video.reason + ")")
-
-                else:
-                    print(" " + video.title + " (" + video.video_id + ")" + " [" + video_tags_concatenated + "]")
+            playlist_videos = (self._video_library.get_video(video_id) for video_id in self._playlist_library.get_videos_from_playlist(playlist_name))
+            self._output.write_lines(self._video_lines(playlist_videos))
 
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
@@ -304,35 +294,25 @@ class VideoPlayer:
             video_id: The video_id to be removed.
         """
 
-        playlist_found = False
-        for playlist_title in self._playlist_library.titles:
-            if playlist_title.lower() == playlist_name.lower():
-                playlist_found = True
+        playlist_found = self._playlist_library.has_playlist(playlist_name)
 
-        video_found = False
-        videos_list = self._video_library.get_all_videos()
-        for video in videos_list:
-            if video.video_id == video_id:
-                video_found = True
+        video_found = self._video_library.get_video(video_id) is not None
 
-        video_in_playlist = False
-        if playlist_found:
-            for video in self._playlist_library.get_videos_from_playlist(playlist_name):
-                if video == video_id:
-                    video_in_playlist = True
+        video_in_playlist = playlist_found and self._playlist_library.playlist_contains(playlist_name, video_id)
 
         if not playlist_found:
-            print("Cannot remove video from " + playlist_name + ": Playlist does not exist")
+            self._output.write_line("Cannot remove video from " + playlist_name + ": Playlist does not exist")
 
         elif not video_found:
-            print("Cannot remove video from " + playlist_name + ": Video does not exist")
+            self._output.write_line("Cannot remove video from " + playlist_name + ": Video does not exist")
+            self._suggest_video_ids(video_id)
 
         elif not video_in_playlist:
-            print("Cannot remove video from " + playlist_name + ": Video is not in playlist")
+            self._output.write_line("Cannot remove video from " + playlist_name + ": Video is not in playlist")
 
         else:
             self._playlist_library.remove_video_from_playlist(playlist_name, video_id)
-            print("Removed video from " + playlist_name + ": " + self._video_library.get_video(video_id).title)
+            self._output.write_line("Removed video from " + playlist_name + ": " + self._video_library.get_video(video_id).title)
 
     def clear_playlist(self, playlist_name):
         """Removes all videos from a playlist with a given name.
@@ -341,17 +321,14 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
 
-        playlist_found = False
-        for playlist_title in self._playlist_library.titles:
-            if playlist_title.lower() == playlist_name.lower():
-                playlist_found = True
+        playlist_found = self._playlist_library.has_playlist(playlist_name)
 
         if not playlist_found:
-            print("Cannot clear playlist " + playlist_name + ": Playlist does not exist")
+            self._output.write_line("Cannot clear playlist " + playlist_name + ": Playlist does not exist")
 
         else:
             self._playlist_library.clear_playlist(playlist_name)
-            print("Successfully removed all videos from " + playlist_name)
+            self._output.write_line("Successfully removed all videos from " + playlist_name)
 
     def delete_playlist(self, playlist_name):
         """Deletes a playlist with a given name.
@@ -360,136 +337,128 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
 
-        playlist_found = False
-        for playlist_title in self._playlist_library.titles:
-            if playlist_title.lower() == playlist_name.lower():
-                playlist_found = True
+        playlist_found = self._playlist_library.has_playlist(playlist_name)
 
         if not playlist_found:
-            print("Cannot delete playlist " + playlist_name + ": Playlist does not exist")
+            self._output.write_line("Cannot delete playlist " + playlist_name + ": Playlist does not exist")
 
         else:
             self._playlist_library.delete_playlist(playlist_name)
-            print("Deleted playlist: " + playlist_name)
+            self._output.write_line("Deleted playlist: " + playlist_name)
 
-    def search_videos(self, search_term):
+    def search_videos(self, search_term, limit=None):
         """Display all the videos whose titles contain the search_term.
 
         Args:
             search_term: The query to be used in search.
+            limit: The most results to list. None for no limit.
         """
 
-        videos_list = self._video_library.get_all_videos()
-        videos_id_list = []
-        sorted_videos_list =[]
-        counter = 0
-        show_once = False
-
-        video_list_unflagged = []
-        for video in videos_list:
-            if not video.flagged:
-                video_list_unflagged.append(video)
-
-        for video in video_list_unflagged:
-            videos_id_list.append(video.video_id)
-
-        for sorted_video_id in sorted(videos_id_list):
-            sorted_videos_list.append(self._video_library.get_video(sorted_video_id))
-
-        for video in sorted_videos_list:
-            video_tags = video.tags
-            video_tags_concatenated = ""
-            count = 0
-            for tag in video_tags:
-                count += 1
-                video_tags_concatenated += tag
-                if count != len(video_tags):
-                    video_tags_concatenated += " "
-
-            if search_term.lower() in video.title.lower():
-                counter += 1
-                if not show_once:
-                    print("Here are the results for " + search_term + ":")
-                    show_once = True
-
-                print(" " + str(counter) + ") " + video.title + " (" + video.video_id + ")" + " [" + video_tags_concatenated + "]")
-
-        if counter > 0:
-            print("Would you like to play any of the above? If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
-
-            number = input()
-            if number.isnumeric():
-                number = int(number)
-            else:
-                number = 0
-
-        if counter > 0:
-            for i in range(counter):
-                if number == (i + 1):
-                    self.play_video(sorted_videos_list[number - 1].video_id)
-        else:
-            print("No search results for " + search_term)
+        self._show_search_results(search_term, lambda cached=True: self._video_library.iter_search_videos(search_term, limit, cached), self._video_library.suggest_title_words)
 
-    def search_videos_tag(self, video_tag):
+    def search_videos_tag(self, video_tag, exact=False, limit=None):
         """Display all videos whose tags contains the provided tag.
 
         Args:
             video_tag: The video tag to be used in search.
+            exact: If True, only list videos carrying exactly this tag
+                instead of any tag containing it.
+            limit: The most results to list. None for no limit.
         """
 
-        videos_list = self._video_library.get_all_videos()
-        videos_id_list = []
-        sorted_videos_list = []
-        counter = 0
-        show_once = False
-
-        video_list_unflagged = []
-        for video in videos_list:
-            if not video.flagged:
-                video_list_unflagged.append(video)
-
-        for video in video_list_unflagged:
-            videos_id_list.append(video.video_id)
-
-        for sorted_video_id in sorted(videos_id_list):
-            sorted_videos_list.append(self._video_library.get_video(sorted_video_id))
-
-        for video in sorted_videos_list:
-            video_tags = video.tags
-            video_tags_concatenated = ""
-            count = 0
-            for tag in video_tags:
-                count += 1
-                video_tags_concatenated += tag
-                if count != len(video_tags):
-                    video_tags_concatenated += " "
-
-            if (video_tag.lower() in video_tags_concatenated.lower()) and ("#" in video_tag):
-                counter += 1
-                if not show_once:
-                    print("Here are the results for " + video_tag + ":")
-                    show_once = True
-
-                print(" " + str(
-                    counter) + ") " + video.title + " (" + video.video_id + ")" + " [" + video_tags_concatenated + "]")
-
-        if counter > 0:
-            print("Would you like to play any of the above? If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
-
-            number = input()
-            if number.isnumeric():
-                number = int(number)
-            else:
-                number = 0
+        self._show_search_results(video_tag, lambda cached=True: self._video_library.iter_search_videos_with_tag(video_tag, exact, limit, cached))
 
-        if counter > 0:
-            for i in range(counter):
-                if number == (i + 1):
-                    self.play_video(sorted_videos_list[number - 1].video_id)
-        else:
-            print("No search results for " + video_tag)
+    def search_videos_tag_query(self, tag_query, limit=None):
+        """Display all videos whose tags match a boolean tag query.
+
+        Args:
+            tag_query: Tags combined with AND, OR, NOT and parentheses.
+            limit: The most results to list. None for no limit.
+        """
+
+        try:
+            videos = self._video_library.search_videos_with_tag_query(tag_query, limit)
+        except ValueError as e:
+            self._output.write_line("Cannot search for " + tag_query + ": " + str(e))
+            return
+        self._show_search_results(tag_query, lambda cached=True: iter(videos))
+
+    def search_videos_ranked(self, query, limit=10):
+        """Display the videos most relevant to a query, best first.
+
+        Args:
+            query: Words to look for in titles and tags.
+            limit: The most results to list.
+        """
+
+        videos = self._video_library.search_videos_ranked(query, limit)
+        self._show_search_results(query, lambda cached=True: iter(videos))
+
+    def _show_search_results(self, query, search, suggest=None):
+        """Lists numbered search results and plays the one the user picks.
+
+        Results are written as they are found, so a streaming search holds
+        only the result being written, while a search that returns a list
+        is simply listed from it. To play the chosen result the search is
+        run again up to it, with cached=False so the replay is not counted
+        as a cache lookup.
+
+        Args:
+            query: The search term or tag, as entered.
+            search: A function returning a new iterator over the results,
+                taking an optional cached flag for the library's cache.
+            suggest: An optional function returning the terms to suggest
+                when nothing is found.
+        """
+        videos = search()
+        first = next(videos, None)
+        if first is None:
+            self._output.write_line("No search results for " + query)
+            if suggest is not None:
+                self._suggest(suggest(query))
+            return
+
+        self._output.write_line("Here are the results for " + query + ":")
+        self._output.write_lines(" " + str(number) + ") " + video.display_line for number, video in enumerate(chain((first,), videos), 1))
+
+        number = self._ask_video_number()
+        if number >= 1:
+            video = next(islice(search(cached=False), number - 1, None), None)
+            if video is not None:
+                self.play_video(video.video_id)
+
+    def _suggest_video_ids(self, video_id):
+        """Suggests the video ids close to one that does not exist."""
+        self._suggest(self._video_library.suggest_video_ids(video_id))
+
+    def _suggest(self, suggestions):
+        """Writes a "Did you mean" line, if there is anything to suggest."""
+        if suggestions:
+            self._output.write_line("Did you mean: " + ", ".join(suggestions) + "?")
+
+    def _video_lines(self, videos):
+        """Yields the listing line of each video, marking flagged ones."""
+        for video in videos:
+            yield " " + video.listing_line
+
+    def _ask_video_number(self):
+        """Asks the user which of the listed search results to play.
+
+        Returns:
+            The number entered, or 0 if it is not a valid number or the
+            player is not interactive.
+        """
+        self._output.write_line("Would you like to play any of the above? If yes, specify the number of the video.")
+        self._output.write_line("If your answer is not a valid number, we will assume it's a no.")
+
+        if not self._interactive:
+            return 0
+
+        self._output.flush()
+        number = input()
+        if number.isnumeric():
+            return int(number)
+        return 0
 
     def flag_video(self, video_id, flag_reason=""):
         """Mark a video as flagged.
@@ -505,24 +474,22 @@ class VideoPlayer:
         else:
             reason = flag_reason
 
-        video_found = False
-        videos_list = self._video_library.get_all_videos()
-        for video in videos_list:
-            if video.video_id == video_id:
-                video_found = True
+        video_found = self._video_library.get_video(video_id) is not None
 
         if not video_found:
-            print("Cannot flag video: Video does not exist")
+            self._output.write_line("Cannot flag video: Video does not exist")
+            self._suggest_video_ids(video_id)
 
         elif self._video_library.get_video(video_id).flagged:
-            print("Cannot flag video: Video is already flagged")
+            self._output.write_line("Cannot flag video: Video is already flagged")
 
         else:
-            if self._video_library.get_video(video_id).playing or self._video_library.get_video(video_id).paused:
+            current_video = self._playback.video
+            if current_video is not None and current_video.video_id == video_id:
                 self.stop_video()
 
-            self._video_library.get_video(video_id).switch_flagged_state(reason)
-            print("Successfully flagged video: " + self._video_library.get_video(video_id).title + " (reason: " + reason + ")")
+            self._video_library.flag_video(video_id, reason)
+            self._output.write_line("Successfully flagged video: " + self._video_library.get_video(video_id).title + " (reason: " + reason + ")")
 
     def allow_video(self, video_id):
         """Removes a flag from a video.
@@ -531,18 +498,15 @@ class VideoPlayer:
             video_id: The video_id to be allowed again.
         """
 
-        video_found = False
-        videos_list = self._video_library.get_all_videos()
-        for video in videos_list:
-            if video.video_id == video_id:
-                video_found = True
+        video_found = self._video_library.get_video(video_id) is not None
 
         if not video_found:
-            print("Cannot remove flag from video: Video does not exist")
+            self._output.write_line("Cannot remove flag from video: Video does not exist")
+            self._suggest_video_ids(video_id)
 
         elif not self._video_library.get_video(video_id).flagged:
-            print("Cannot remove flag from video: Video is not flagged")
+            self._output.write_line("Cannot remove flag from video: Video is not flagged")
 
         else:
-            self._video_library.get_video(video_id).switch_flagged_state("")
-            print("Successfully removed flag from video: " + self._video_library.get_video(video_id).title)
+            self._video_library.allow_video(video_id)
+            self._output.write_line("Successfully removed flag from video: " + self._video_library.get_video(video_id).title)
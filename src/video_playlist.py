@@ -1,76 +1,87 @@
 """A video playlist class."""
 
+from bisect import insort
+
+from .search_index import complete_sorted, remove_sorted
+
 
 class Playlist:
-    """A class used to represent a Playlist library."""
+    """A class used to represent a Playlist library.
+
+    Playlists are keyed by their casefolded name, so looking one up
+    ignores case and costs a single dictionary lookup. The names are kept
+    as the user entered them, in a list that stays sorted as playlists
+    are created and deleted. The casefolded names are kept sorted too, to
+    complete playlist names from a prefix.
+
+    The contents of each playlist are stored as the keys of a dict, which
+    acts as an insertion-ordered set: checking, adding and removing a
+    video are constant time and videos keep the order they were added in.
+    """
 
     def __init__(self):
         """Playlist library constructor."""
+        self._names = {}
+        self._playlists = {}
         self._titles = []
-        self._playlists = []
+        self._keys = []
 
     @property
-    def titles(self) -> str:
-        """Returns the titles of Playlists from the Playlist library."""
+    def titles(self) -> list:
+        """Returns the sorted titles of Playlists from the Playlist library."""
         return self._titles
 
+    def has_playlist(self, playlist_title: str) -> bool:
+        """Returns True if a Playlist exists, ignoring case."""
+        return playlist_title.casefold() in self._playlists
+
     def create_playlist(self, playlist_title: str):
         """Creates a Playlist in the Playlist library."""
-        self._titles.append(playlist_title)
-        self._playlists.append([])
+        key = playlist_title.casefold()
+        self._names[key] = playlist_title
+        self._playlists[key] = {}
+        insort(self._titles, playlist_title)
+        insort(self._keys, key)
 
     def add_videos_to_playlist(self, playlist_title: str, video_id: str):
         """Adds videos to Playlist."""
-        playlist_index = -1
-        count = -1
-        for playlist in self._titles:
-            count += 1
-            if playlist.lower() == playlist_title.lower():
-                playlist_index = count
-
-        self._playlists[playlist_index].append(video_id)
+        self._playlists[playlist_title.casefold()][video_id] = None
 
     def get_videos_from_playlist(self, playlist_title: str):
-        """Gets videos from Playlist."""
-        playlist_index = -1
-        count = -1
-        for playlist in self._titles:
-            count += 1
-            if playlist.lower() == playlist_title.lower():
-                playlist_index = count
+        """Gets videos from Playlist, in the order they were added."""
+        return self._playlists[playlist_title.casefold()].keys()
 
-        return self._playlists[playlist_index]
+    def playlist_contains(self, playlist_title: str, video_id: str) -> bool:
+        """Returns True if a video is in the Playlist."""
+        return video_id in self._playlists[playlist_title.casefold()]
 
     def remove_video_from_playlist(self, playlist_title: str, video_id: str):
         """Removes video from Playlist."""
-        playlist_index = -1
-        count = -1
-        for playlist in self._titles:
-            count += 1
-            if playlist.lower() == playlist_title.lower():
-                playlist_index = count
-
-        return self._playlists[playlist_index].remove(video_id)
+        del self._playlists[playlist_title.casefold()][video_id]
 
     def clear_playlist(self, playlist_title: str):
         """Clears Playlist."""
-        playlist_index = -1
-        count = -1
-        for playlist in self._titles:
-            count += 1
-            if playlist.lower() == playlist_title.lower():
-                playlist_index = count
-
-        self._playlists[playlist_index] = []
+        self._playlists[playlist_title.casefold()] = {}
 
     def delete_playlist(self, playlist_title: str):
         """Deletes Playlist."""
-        playlist_index = -1
-        count = -1
-        for playlist in self._titles:
-            count += 1
-            if playlist.lower() == playlist_title.lower():
-                playlist_index = count
-
-        del self._playlists[playlist_index]
-        self._titles.remove(playlist_title)
+        key = playlist_title.casefold()
+        del self._playlists[key]
+        remove_sorted(self._titles, self._names.pop(key))
+        remove_sorted(self._keys, key)
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """Returns the titles of Playlists starting with a prefix.
+
+        The prefix is matched ignoring case.
+
+        Args:
+            prefix: The start of a playlist title.
+            limit: The most titles to return.
+
+        Returns:
+            The titles as they were created, ordered by their casefolded
+            form.
+        """
+        keys = complete_sorted(self._keys, prefix.casefold(), limit)
+        return [self._names[key] for key in keys]
@@ -0,0 +1,56 @@
+"""A pool of video ids to pick random videos from."""
+
+
+class VideoPool:
+    """A class used to represent a set of video ids with random picks.
+
+    The ids are kept in a dense list, with a map from each id to its slot
+    in it. A removed id is overwritten by the last one, which moves into
+    its slot, so adding, removing and picking an id uniformly at random
+    all take constant time.
+    """
+
+    def __init__(self, video_ids=()):
+        """VideoPool constructor.
+
+        Args:
+            video_ids: The distinct ids the pool starts with.
+        """
+        self._video_ids = list(video_ids)
+        self._slots = {video_id: slot
+                       for slot, video_id in enumerate(self._video_ids)}
+
+    def __len__(self):
+        return len(self._video_ids)
+
+    def __contains__(self, video_id):
+        return video_id in self._slots
+
+    def add(self, video_id: str):
+        """Adds a video id, unless the pool already holds it."""
+        if video_id not in self._slots:
+            self._slots[video_id] = len(self._video_ids)
+            self._video_ids.append(video_id)
+
+    def remove(self, video_id: str):
+        """Removes a video id, if the pool holds it."""
+        slot = self._slots.pop(video_id, None)
+        if slot is None:
+            return
+        last = self._video_ids.pop()
+        if last != video_id:
+            self._video_ids[slot] = last
+            self._slots[last] = slot
+
+    def choice(self, rng):
+        """Returns a video id picked uniformly at random.
+
+        Args:
+            rng: The random.Random to pick with.
+
+        Returns:
+            The video id, or None if the pool is empty.
+        """
+        if not self._video_ids:
+            return None
+        return self._video_ids[rng.randrange(len(self._video_ids))]
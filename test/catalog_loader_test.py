@@ -0,0 +1,146 @@
+import pytest
+
+from src.catalog_loader import (
+    LazyRows, load_snapshot, parse_catalog, resolve_sources, snapshot_path)
+from src.video import VideoColumns
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+CATALOG = """Funny Dogs | funny_dogs_video_id |  #dog , #animal
+Amazing Cats | amazing_cats_video_id |  #cat , #animal
+Video about nothing | nothing_video_id |
+"""
+
+
+def _write_catalog(tmp_path, contents=CATALOG):
+    path = tmp_path / "videos.txt"
+    path.write_text(contents)
+    return path
+
+
+def test_lazy_rows_parse_rows_on_first_lookup(tmp_path):
+    columns = VideoColumns()
+    rows = LazyRows(_write_catalog(tmp_path), columns)
+    assert len(rows) == 3
+    assert list(rows) == [
+        "funny_dogs_video_id", "amazing_cats_video_id", "nothing_video_id"]
+    assert "amazing_cats_video_id" in rows
+    assert len(columns) == 0
+
+    row = rows["amazing_cats_video_id"]
+    assert len(columns) == 1
+    assert columns.title(row) == "Amazing Cats"
+    assert columns.tags(row) == ("#cat", "#animal")
+    assert rows["amazing_cats_video_id"] == row
+    assert columns.tags(rows["nothing_video_id"]) == ()
+    assert rows.get("does_not_exist") is None
+
+
+def test_lazy_rows_empty_file(tmp_path):
+    rows = LazyRows(_write_catalog(tmp_path, ""), VideoColumns())
+    assert len(rows) == 0
+
+
+def test_lazy_library_matches_eager_library(tmp_path):
+    path = _write_catalog(tmp_path)
+    eager = VideoLibrary(path)
+    lazy = VideoLibrary(path, lazy=True)
+
+    lazy.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    eager.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    for library in (eager, lazy):
+        assert len(library) == 3
+        assert [video.video_id for video in library.search_videos("a")] == [
+            "amazing_cats_video_id", "nothing_video_id"]
+        assert [video.video_id for video in
+                library.search_videos_with_tag("#animal")] == [
+            "amazing_cats_video_id"]
+
+
+def test_player_on_lazy_library(tmp_path, capfd):
+    player = VideoPlayer(VideoLibrary(_write_catalog(tmp_path), lazy=True))
+    player.show_all_videos()
+    player.play_video("funny_dogs_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "Playing video: Funny Dogs" in lines[4]
+
+
+def test_snapshot_written_after_parse_and_reused(tmp_path):
+    path = _write_catalog(tmp_path)
+    assert load_snapshot(path) is None
+
+    VideoLibrary(path)
+    assert snapshot_path(path).exists()
+    assert load_snapshot(path).to_snapshot() == parse_catalog(path).to_snapshot()
+    library = VideoLibrary(path)
+    assert library.get_video("amazing_cats_video_id").tags == (
+        "#cat", "#animal")
+
+
+def test_snapshot_ignored_when_catalog_changes(tmp_path):
+    path = _write_catalog(tmp_path)
+    VideoLibrary(path)
+    with open(path, "a") as catalog:
+        catalog.write("Life at Google | life_at_google_video_id | #google\n")
+
+    assert load_snapshot(path) is None
+    assert len(VideoLibrary(path)) == 4
+    assert len(load_snapshot(path)) == 4
+
+
+def test_corrupt_snapshot_falls_back_to_parsing(tmp_path):
+    path = _write_catalog(tmp_path)
+    VideoLibrary(path)
+    with open(snapshot_path(path), "r+b") as snapshot:
+        snapshot.seek(-4, 2)
+        snapshot.truncate()
+
+    assert load_snapshot(path) is None
+    assert len(VideoLibrary(path)) == 3
+
+
+def test_snapshot_can_be_disabled(tmp_path):
+    path = _write_catalog(tmp_path)
+    VideoLibrary(path, snapshot=False)
+    assert not snapshot_path(path).exists()
+
+
+SHARD = """Life at Google | life_at_google_video_id |  #google , #career
+Amazing Cats Again | amazing_cats_video_id |  #cat
+"""
+
+
+def _write_shards(tmp_path):
+    (tmp_path / "shard_1.txt").write_text(CATALOG)
+    (tmp_path / "shard_2.txt").write_text(SHARD)
+
+
+@pytest.mark.parametrize("options", [
+    {"snapshot": False, "workers": 2}, {"workers": 1}, {"lazy": True}])
+def test_library_merges_sources_in_order(tmp_path, options):
+    _write_shards(tmp_path)
+    library = VideoLibrary(str(tmp_path / "shard_*.txt"), **options)
+
+    assert len(library) == 4
+    assert library.duplicate_video_ids == ["amazing_cats_video_id"]
+    assert library.get_video("amazing_cats_video_id").title == "Amazing Cats"
+    assert [video.video_id for video in library.get_all_videos()] == [
+        "funny_dogs_video_id", "amazing_cats_video_id", "nothing_video_id",
+        "life_at_google_video_id"]
+    assert library.get_video("life_at_google_video_id").tags == (
+        "#google", "#career")
+    assert [video.video_id for video in
+            library.search_videos_with_tag("#cat")] == [
+        "amazing_cats_video_id"]
+
+
+def test_resolve_sources_keeps_order_and_drops_repeats(tmp_path):
+    _write_shards(tmp_path)
+    first = tmp_path / "shard_1.txt"
+    assert resolve_sources([tmp_path / "shard_2.txt", str(tmp_path / "*.txt"),
+                            first]) == [tmp_path / "shard_2.txt", first]
+    with pytest.raises(FileNotFoundError):
+        resolve_sources(str(tmp_path / "missing_*.txt"))
@@ -0,0 +1,95 @@
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.output_sink import MemorySink
+from src.video_player import VideoPlayer
+
+
+def _parser():
+    output = MemorySink()
+    return CommandParser(VideoPlayer(interactive=False, output=output)), output
+
+
+def test_commands_are_dispatched_in_any_case():
+    parser, output = _parser()
+    parser.execute_command(["play", "amazing_cats_video_id"])
+    parser.execute_command(["Show_Playing"])
+    assert output.lines() == [
+        "Playing video: Amazing Cats",
+        "Currently playing: Amazing Cats (amazing_cats_video_id) [#cat #animal]"]
+
+
+def test_optional_arguments():
+    parser, output = _parser()
+    parser.execute_command(["FLAG_VIDEO", "funny_dogs_video_id"])
+    parser.execute_command(["FLAG_VIDEO", "amazing_cats_video_id", "dont_like"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#ca", "exact"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#ca"])
+    lines = output.lines()
+    assert "(reason: Not supplied)" in lines[0]
+    assert "(reason: dont_like)" in lines[1]
+    assert "No search results for #ca" in lines[2]
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[4]
+
+
+@pytest.mark.parametrize("command, message", [
+    (["PLAY"], "Please enter PLAY command followed by video_id."),
+    (["ADD_TO_PLAYLIST", "my_playlist"],
+     "Please enter ADD_TO_PLAYLIST command followed by a playlist name and "
+     "video_id to add."),
+    (["FLAG_VIDEO", "a", "b", "c"],
+     "Please enter FLAG_VIDEO command followed by a video_id and an optional "
+     "flag reason."),
+    (["SEARCH_VIDEOS_WITH_TAG", "#cat", "NOT_EXACT"],
+     "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a video tag "
+     "and an optional EXACT and an optional result limit."),
+    (["SEARCH_VIDEOS", "cat", "0"],
+     "Please enter SEARCH_VIDEOS command followed by a search term and an "
+     "optional result limit."),
+])
+def test_usage_errors_come_from_the_spec(command, message):
+    parser, _ = _parser()
+    with pytest.raises(CommandException) as error:
+        parser.execute_command(command)
+    assert str(error.value) == message
+
+
+def test_commands_without_arguments_ignore_extra_words():
+    parser, output = _parser()
+    parser.execute_command(["NUMBER_OF_VIDEOS", "please"])
+    assert output.lines() == ["5 videos in the library"]
+
+
+def test_search_result_limit():
+    parser, output = _parser()
+    parser.execute_command(["SEARCH_VIDEOS", "cat", "1"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#animal", "2", "exact"])
+    lines = output.lines()
+    assert lines[:2] == [
+        "Here are the results for cat:",
+        " 1) Amazing Cats (amazing_cats_video_id) [#cat #animal]"]
+    assert lines[4:7] == [
+        "Here are the results for #animal:",
+        " 1) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        " 2) Another Cat Video (another_cat_video_id) [#cat #animal]"]
+
+
+def test_complete_lists_video_ids_then_playlists():
+    parser, output = _parser()
+    parser.execute_command(["CREATE_PLAYLIST", "Another_list"])
+    parser.execute_command(["COMPLETE", "a"])
+    parser.execute_command(["COMPLETE", "an", "1"])
+    parser.execute_command(["COMPLETE", "zz"])
+    assert output.lines()[1:] == [
+        "Completions for a:",
+        " amazing_cats_video_id",
+        " another_cat_video_id",
+        " Another_list",
+        "Completions for an:",
+        " another_cat_video_id",
+        "No completions for zz",
+    ]
+    assert parser.completions("sea", first_word=True) == [
+        "SEARCH_VIDEOS", "SEARCH_VIDEOS_WITH_TAG", "SEARCH_VIDEOS_WITH_TAGS",
+        "SEARCH_VIDEOS_RANKED"]
+    assert parser.completions("funny") == ["funny_dogs_video_id"]
@@ -0,0 +1,89 @@
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.command_parser import CommandParser
+from src.output_sink import NullSink
+from src.playback import STOPPED
+from src.rwlock import ReadWriteLock
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+VIDEO_IDS = ["amazing_cats_video_id", "another_cat_video_id",
+             "funny_dogs_video_id", "life_at_google_video_id",
+             "nothing_video_id"]
+
+WORKLOAD = [
+    "NUMBER_OF_VIDEOS", "SHOW_ALL_VIDEOS", "PLAY {video}", "PLAY_RANDOM",
+    "STOP", "PAUSE", "CONTINUE", "SHOW_PLAYING", "CREATE_PLAYLIST {name}",
+    "ADD_TO_PLAYLIST {name} {video}", "REMOVE_FROM_PLAYLIST {name} {video}",
+    "SHOW_PLAYLIST {name}", "SHOW_ALL_PLAYLISTS", "CLEAR_PLAYLIST {name}",
+    "DELETE_PLAYLIST {name}", "SEARCH_VIDEOS cat",
+    "SEARCH_VIDEOS_WITH_TAG #animal", "FLAG_VIDEO {video} spam",
+    "ALLOW_VIDEO {video}",
+]
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # Switch threads far more often than usual so races show up.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_write_lock_is_exclusive():
+    lock = ReadWriteLock()
+    counter = [0]
+
+    def increment():
+        for _ in range(200):
+            with lock.writing():
+                value = counter[0]
+                threading.Event().wait(0)
+                counter[0] = value + 1
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter[0] == 1600
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_mixed_workload_from_many_threads(lazy):
+    library = VideoLibrary(lazy=lazy)
+    players = [VideoPlayer(library, interactive=False, output=NullSink())
+               for _ in range(8)]
+    parsers = [CommandParser(player) for player in players]
+
+    def hammer(seed):
+        rng = random.Random(seed)
+        for _ in range(300):
+            command = rng.choice(WORKLOAD).format(
+                video=rng.choice(VIDEO_IDS),
+                name=rng.choice(["mix", "MIX", "other"]))
+            # Several threads drive the same session at once.
+            rng.choice(parsers).execute_command(command.split())
+
+    with ThreadPoolExecutor(16) as executor:
+        list(executor.map(hammer, range(32)))
+
+    for player in players:
+        playback = player._playback
+        assert (playback.video is None) == (playback.state == STOPPED)
+        playlists = player._playlist_library
+        assert playlists.titles == sorted(set(playlists.titles))
+        for title in playlists.titles:
+            videos = list(playlists.get_videos_from_playlist(title))
+            assert len(videos) == len(set(videos))
+
+    assert list(library._sorted_ids) == sorted(VIDEO_IDS)
+    for video in library.get_all_videos():
+        found = video in library.search_videos(video.title)
+        assert found != video.flagged
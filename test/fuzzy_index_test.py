@@ -0,0 +1,84 @@
+from src.fuzzy_index import FuzzyIndex, within_one_edit
+from src.output_sink import MemorySink
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_within_one_edit():
+    assert within_one_edit("cat", "cat")
+    assert within_one_edit("cat", "cut")
+    assert within_one_edit("cat", "cats")
+    assert within_one_edit("cat", "at")
+    assert within_one_edit("cat", "act")
+    assert not within_one_edit("cat", "tac")
+    assert not within_one_edit("cat", "dogs")
+
+
+def test_fuzzy_index_finds_words_within_one_edit():
+    index = FuzzyIndex(["cat", "cats", "act", "dog", "catalog"])
+    assert index.lookup("cat") == ["cat", "act", "cats"]
+    assert index.lookup("cta") == ["cat"]
+    assert index.lookup("dgo") == ["dog"]
+    assert index.lookup("cat", limit=1) == ["cat"]
+    assert index.lookup("bird") == []
+
+    index.remove("cat")
+    index.remove("bird")
+    assert index.lookup("cta") == []
+    assert index.lookup("cat") == ["act", "cats"]
+
+
+def test_library_suggestions_follow_the_catalog():
+    library = VideoLibrary(suggestions=True)
+    assert library.suggest_video_ids("funny_dog_video_id") == [
+        "funny_dogs_video_id"]
+    assert library.suggest_title_words("Cst") == ["cat"]
+    assert library.suggest_title_words("cat") == ["at", "cats"]
+
+    library.add_video(Video("Funny Dog", "funny_dog_video_id", []))
+    library.remove_video("another_cat_video_id")
+    assert library.suggest_video_ids("funny_dog_video_id") == [
+        "funny_dog_video_id", "funny_dogs_video_id"]
+    assert library.suggest_title_words("dogz") == ["dog", "dogs"]
+    assert library.suggest_title_words("Cst") == []
+
+    library.flag_video("amazing_cats_video_id", "dont_like")
+    assert library.suggest_title_words("cas") == []
+    library.allow_video("amazing_cats_video_id")
+    assert library.suggest_title_words("cas") == ["cats"]
+
+
+def test_flagged_titles_are_not_suggested():
+    library = VideoLibrary(lazy=True, suggestions=True)
+    library.flag_video("amazing_cats_video_id", "dont_like")
+    assert library.suggest_title_words("cas") == ["cat"]
+    assert library.suggest_video_ids("amazing_cat_video_id") == [
+        "amazing_cats_video_id"]
+
+    library.reload()
+    assert library.suggest_title_words("cas") == ["cat"]
+
+
+def test_player_suggests_only_when_there_are_candidates():
+    output = MemorySink()
+    player = VideoPlayer(VideoLibrary(suggestions=True), interactive=False,
+                         output=output)
+    player.play_video("amazing_cat_video_id")
+    player.play_video("does_not_exist")
+    player.search_videos("dgos")
+    assert output.lines() == [
+        "Cannot play video: Video does not exist",
+        "Did you mean: amazing_cats_video_id?",
+        "Cannot play video: Video does not exist",
+        "No search results for dgos",
+        "Did you mean: dogs?",
+    ]
+
+
+def test_suggestions_are_off_by_default():
+    output = MemorySink()
+    player = VideoPlayer(interactive=False, output=output)
+    player.play_video("amazing_cat_video_id")
+    assert output.lines() == ["Cannot play video: Video does not exist"]
+    assert player.video_library.suggest_title_words("Cst") == []
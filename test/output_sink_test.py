@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from src.command_parser import CommandParser
+from src.output_sink import BufferedFileSink, MemorySink, NullSink
+from src.output_sink import OutputSink
+from src.video_player import VideoPlayer
+
+
+def test_memory_sink_collects_player_output():
+    output = MemorySink()
+    player = VideoPlayer(output=output)
+    player.show_all_videos()
+    player.play_video("funny_dogs_video_id")
+    lines = output.lines()
+    assert len(lines) == 7
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "Playing video: Funny Dogs" in lines[6]
+
+    output.clear()
+    assert output.getvalue() == ""
+
+
+def test_command_parser_writes_to_player_sink(capfd):
+    output = MemorySink()
+    parser = CommandParser(VideoPlayer(output=output))
+    parser.execute_command(["NOT_A_COMMAND"])
+    out, err = capfd.readouterr()
+    assert out == ""
+    assert output.lines() == [
+        "Please enter a valid command, type HELP for a list of available "
+        "commands."]
+
+
+def test_buffered_file_sink_writes_in_chunks():
+    file = io.StringIO()
+    sink = BufferedFileSink(file, buffer_size=10)
+    sink.write_line("abc")
+    assert file.getvalue() == ""
+    sink.write_lines(["defgh", "ijk"])
+    assert file.getvalue() == "abc\ndefgh\nijk\n"
+    sink.write_line("lmn")
+    sink.flush()
+    assert file.getvalue() == "abc\ndefgh\nijk\nlmn\n"
+
+
+def test_null_sink_discards_output():
+    player = VideoPlayer(output=NullSink())
+    player.show_all_videos()
+    player.play_video("funny_dogs_video_id")
+    player.show_playing()
+
+
+def test_output_sink_requires_write():
+    class NoWriteSink(OutputSink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWriteSink()
+    with pytest.raises(TypeError):
+        OutputSink()
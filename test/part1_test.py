@@ -123,6 +123,19 @@ def test_play_random_stops_previous_video(capfd):
         lines[2])
 
 
+def test_play_random_stops_paused_video(capfd):
+    player = VideoPlayer()
+    player.play_video("amazing_cats_video_id")
+    player.pause_video()
+    player.play_random_video()
+    player.show_playing()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Stopping video: Amazing Cats" in lines[2]
+    assert "PAUSED" not in lines[4]
+
+
 def test_show_playing(capfd):
     player = VideoPlayer()
     player.play_video("amazing_cats_video_id")
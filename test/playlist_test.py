@@ -0,0 +1,54 @@
+from src.video_playlist import Playlist
+
+
+def test_playlists_are_looked_up_ignoring_case():
+    playlists = Playlist()
+    playlists.create_playlist("My_Playlist")
+    playlists.add_videos_to_playlist("my_PLAYLIST", "amazing_cats_video_id")
+
+    assert playlists.has_playlist("MY_playlist")
+    assert playlists.titles == ["My_Playlist"]
+    assert list(playlists.get_videos_from_playlist("My_Playlist")) == [
+        "amazing_cats_video_id"]
+    assert not playlists.has_playlist("other_playlist")
+
+
+def test_titles_stay_sorted():
+    playlists = Playlist()
+    for title in ["b_playlist", "C_playlist", "a_playlist"]:
+        playlists.create_playlist(title)
+    assert playlists.titles == ["C_playlist", "a_playlist", "b_playlist"]
+
+    playlists.delete_playlist("A_PLAYLIST")
+    assert playlists.titles == ["C_playlist", "b_playlist"]
+    assert not playlists.has_playlist("a_playlist")
+
+
+def test_playlist_contents_keep_insertion_order():
+    playlists = Playlist()
+    playlists.create_playlist("my_playlist")
+    for video_id in ["c_id", "a_id", "b_id"]:
+        playlists.add_videos_to_playlist("my_playlist", video_id)
+    playlists.remove_video_from_playlist("my_playlist", "a_id")
+    playlists.add_videos_to_playlist("my_playlist", "a_id")
+
+    assert list(playlists.get_videos_from_playlist("my_playlist")) == [
+        "c_id", "b_id", "a_id"]
+    assert playlists.playlist_contains("MY_PLAYLIST", "b_id")
+
+    playlists.clear_playlist("my_playlist")
+    assert not playlists.playlist_contains("my_playlist", "b_id")
+    assert len(playlists.get_videos_from_playlist("my_playlist")) == 0
+
+
+def test_complete_playlist_titles_ignores_case():
+    playlists = Playlist()
+    for title in ["my_Playlist", "MY_other", "road_trip"]:
+        playlists.create_playlist(title)
+    assert playlists.complete("my") == ["MY_other", "my_Playlist"]
+    assert playlists.complete("MY_P") == ["my_Playlist"]
+    assert playlists.complete("my", limit=1) == ["MY_other"]
+    assert playlists.complete("x") == []
+
+    playlists.delete_playlist("my_other")
+    assert playlists.complete("my") == ["my_Playlist"]
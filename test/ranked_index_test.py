@@ -0,0 +1,79 @@
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.output_sink import MemorySink
+from src.ranked_index import RankedIndex, tokenize
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_tokenize_splits_on_punctuation():
+    assert tokenize("Funny_Dogs #dog, Life at Google!") == [
+        "funny", "dogs", "dog", "life", "at", "google"]
+
+
+def test_ranked_index_orders_by_relevance():
+    index = RankedIndex()
+    index.add("a_id", "Cat and dog", ["#animal"])
+    index.add("b_id", "Cat cat cat", ["#cat"])
+    index.add("c_id", "Dog", ["#animal"])
+    index.add("d_id", "Long title about one cat among many other words", [])
+
+    assert [video_id for video_id, _ in index.search("cat")] == [
+        "b_id", "a_id", "d_id"]
+    assert [video_id for video_id, _ in index.search("cat", limit=1)] == [
+        "b_id"]
+    assert index.search("cat dog")[0][0] == "a_id"
+    assert index.search("unknown") == []
+
+    index.remove("b_id")
+    assert "b_id" not in index
+    assert [video_id for video_id, _ in index.search("cat")] == ["a_id", "d_id"]
+
+
+def test_ranked_index_breaks_ties_by_video_id():
+    index = RankedIndex()
+    for video_id in ["c_id", "a_id", "b_id"]:
+        index.add(video_id, "Same title", [])
+    assert [video_id for video_id, _ in index.search("same")] == [
+        "a_id", "b_id", "c_id"]
+
+
+def test_library_ranked_search_skips_flagged_videos():
+    library = VideoLibrary()
+    # "Another Cat Video" has "cat" in its title as well as its tags.
+    assert [video.video_id for video in library.search_videos_ranked(
+        "cat")] == ["another_cat_video_id", "amazing_cats_video_id"]
+
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+    assert [video.video_id for video in library.search_videos_ranked(
+        "cat")] == ["another_cat_video_id"]
+    library.allow_video("amazing_cats_video_id")
+    assert len(library.search_videos_ranked("cat")) == 2
+
+
+def test_search_videos_ranked_command():
+    output = MemorySink()
+    parser = CommandParser(VideoPlayer(interactive=False, output=output))
+    parser.execute_command(["SEARCH_VIDEOS_RANKED", "google,career", "1"])
+    parser.execute_command(["SEARCH_VIDEOS_RANKED", "zebra"])
+    lines = output.lines()
+    assert lines[:2] == [
+        "Here are the results for google,career:",
+        " 1) Life at Google (life_at_google_video_id) [#google #career]"]
+    assert lines[-1] == "No search results for zebra"
+
+
+def test_search_videos_ranked_command_takes_several_words():
+    output = MemorySink()
+    parser = CommandParser(VideoPlayer(interactive=False, output=output))
+    parser.execute_command(["SEARCH_VIDEOS_RANKED", "funny", "dogs"])
+    parser.execute_command(["SEARCH_VIDEOS_RANKED", "funny", "dogs", "1"])
+    parser.execute_command(["SEARCH_VIDEOS_RANKED", "2021"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["SEARCH_VIDEOS_RANKED", "funny", "0"])
+    lines = output.lines()
+    assert lines[0] == "Here are the results for funny dogs:"
+    assert lines[1] == " 1) Funny Dogs (funny_dogs_video_id) [#dog #animal]"
+    assert lines.count("Here are the results for funny dogs:") == 2
+    assert lines[-1] == "No search results for 2021"
@@ -0,0 +1,46 @@
+import io
+import sys
+
+from src.run import main, run_batch
+
+
+def test_run_batch_executes_commands_until_exit(capfd):
+    commands = io.StringIO(
+        "NUMBER_OF_VIDEOS\n\nPLAY amazing_cats_video_id\nPLAY\nEXIT\nSTOP\n")
+    executed = run_batch(commands)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert executed == 3
+    assert len(lines) == 3
+    assert "5 videos in the library" in lines[0]
+    assert "Playing video: Amazing Cats" in lines[1]
+    assert "Please enter PLAY command followed by video_id." in lines[2]
+
+
+def test_run_batch_answers_search_questions_with_no(capfd):
+    run_batch(["SEARCH_VIDEOS cat", "SHOW_PLAYING"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 6
+    assert "If your answer is not a valid number" in lines[4]
+    assert "No video is currently playing" in lines[5]
+
+
+def test_main_batch_reports_throughput(tmp_path, capfd):
+    command_file = tmp_path / "commands.txt"
+    command_file.write_text("PLAY funny_dogs_video_id\nSTOP\n")
+    main(["--batch", str(command_file)])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Playing video: Funny Dogs", "Stopping video: Funny Dogs"]
+    assert "Executed 2 commands in" in err
+    assert "commands/second" in err
+
+
+def test_main_batch_leaves_standard_input_open(monkeypatch, capfd):
+    stdin = io.StringIO("NUMBER_OF_VIDEOS\n")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    main(["--batch", "-"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == ["5 videos in the library"]
+    assert not stdin.closed
@@ -0,0 +1,75 @@
+from src.command_parser import CommandParser
+from src.output_sink import MemorySink
+from src.search_cache import SearchCache
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+from unittest import mock
+
+
+def test_search_cache_evicts_least_recently_used():
+    cache = SearchCache(max_entries=2)
+    cache.put("a", 0, ("a_id",))
+    cache.put("b", 0, ("b_id",))
+    assert cache.get("a", 0) == ("a_id",)
+    cache.put("c", 0, ("c_id",))
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == ("a_id",)
+    assert cache.get("c", 1) is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (
+        2, 2, 1, 1)
+    assert stats.hit_ratio == 0.5
+
+
+def test_repeat_searches_hit_the_cache():
+    library = VideoLibrary()
+    assert len(library.search_videos("cat")) == 2
+    assert len(library.search_videos("CAT")) == 2
+    assert len(library.search_videos_with_tag("#Animal", exact=True)) == 3
+    assert len(library.search_videos_with_tag("#animal", exact=True)) == 3
+    stats = library.search_cache_stats()
+    assert (stats.hits, stats.misses) == (2, 2)
+
+
+def test_catalog_changes_invalidate_the_cache(tmp_path):
+    path = tmp_path / "videos.txt"
+    path.write_text("Amazing Cats | amazing_cats_video_id | #cat\n")
+    library = VideoLibrary(path)
+    assert len(library.search_videos("cat")) == 1
+
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+    assert library.search_videos("cat") == []
+    library.allow_video("amazing_cats_video_id")
+    assert len(library.search_videos("cat")) == 1
+    library.add_video(Video("Another Cat", "another_cat_video_id", []))
+    assert len(library.search_videos("cat")) == 2
+
+    path.write_text("Funny Dogs | funny_dogs_video_id | #dog\n")
+    library.reload()
+    assert library.search_videos("cat") == []
+    assert len(library) == 1
+    assert library.search_cache_stats().hits == 0
+
+
+def test_show_search_cache_command():
+    output = MemorySink()
+    parser = CommandParser(VideoPlayer(interactive=False, output=output))
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["SHOW_SEARCH_CACHE"])
+    assert output.lines()[-1] == (
+        "Search cache: 1 hits, 1 misses (50.0% hit ratio), 0 evictions, "
+        "1 cached results")
+
+
+@mock.patch('builtins.input', lambda *args: '1')
+def test_playing_a_search_result_is_one_cache_lookup():
+    library = VideoLibrary()
+    player = VideoPlayer(library, output=MemorySink())
+    player.search_videos("cat")
+    player.search_videos("cat")
+    stats = library.search_cache_stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert player.output.lines()[-1] == "Playing video: Amazing Cats"
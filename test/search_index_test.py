@@ -0,0 +1,134 @@
+from src.search_index import TagIndex, TitleIndex
+from src.video import TagDictionary
+from src.video_library import VideoLibrary
+
+TITLES = {
+    "b_id": "Amazing Cats",
+    "a_id": "Another Cat Video",
+    "c_id": "Funny Dogs",
+    "d_id": "cAT",
+    "e_id": "",
+}
+
+
+def _brute_force(term):
+    return sorted(video_id for video_id, title in TITLES.items()
+                  if term.lower() in title.lower())
+
+
+def test_title_index_matches_substring_search():
+    index = TitleIndex()
+    index.add_all(TITLES.items())
+    for term in ["cat", "CAT", "cats", "at v", "dogs", "ama", "xyz", "video"]:
+        assert index.search(term) == _brute_force(term)
+
+
+def test_title_index_short_terms_check_every_title():
+    index = TitleIndex()
+    index.add_all(TITLES.items())
+    for term in ["", "c", "Ca", "s"]:
+        assert index.search(term) == _brute_force(term)
+
+
+def test_title_index_add_and_remove():
+    index = TitleIndex()
+    index.add_all(TITLES.items())
+    index.remove("a_id")
+    assert index.search("cat") == ["b_id", "d_id"]
+    index.add("a_id", TITLES["a_id"])
+    assert index.search("cat") == ["a_id", "b_id", "d_id"]
+    assert len(index) == len(TITLES)
+
+
+TAGS = {
+    "b_id": ("#cat", "#animal"),
+    "a_id": ("#CAT", "#Animal"),
+    "c_id": ("#dog", "#animal"),
+    "d_id": ("#catalog",),
+    "e_id": (),
+}
+
+
+def _tag_index():
+    tag_dictionary = TagDictionary()
+    index = TagIndex(tag_dictionary)
+    index.add_all((video_id, [tag_dictionary.tag_id(tag) for tag in tags])
+                  for video_id, tags in TAGS.items())
+    return index, tag_dictionary
+
+
+def test_tag_index_substring_mode_keeps_old_behaviour():
+    index, _ = _tag_index()
+    assert index.search("#cat") == ["a_id", "b_id", "d_id"]
+    assert index.search("#ca") == ["a_id", "b_id", "d_id"]
+    assert index.search("#ANIMAL") == ["a_id", "b_id", "c_id"]
+    assert index.search("#a") == ["a_id", "b_id", "c_id"]
+    assert index.search("cat") == []
+
+
+def test_tag_index_exact_mode():
+    index, _ = _tag_index()
+    assert index.search("#cat", exact=True) == ["a_id", "b_id"]
+    assert index.search("#ca", exact=True) == []
+
+
+def test_tag_index_add_and_remove():
+    index, tag_dictionary = _tag_index()
+    index.remove("b_id")
+    assert index.search("#cat", exact=True) == ["a_id"]
+    index.add("b_id", [tag_dictionary.tag_id(tag) for tag in TAGS["b_id"]])
+    assert index.search("#cat", exact=True) == ["a_id", "b_id"]
+
+
+def test_tag_dictionary_assigns_small_integer_ids():
+    tag_dictionary = TagDictionary()
+    assert tag_dictionary.tag_id("#cat") == 0
+    assert tag_dictionary.tag_id("#dog") == 1
+    assert tag_dictionary.tag_id("#cat") == 0
+    assert tag_dictionary.name(1) == "#dog"
+    assert len(tag_dictionary) == 2
+
+
+def test_library_search_skips_flagged_videos():
+    library = VideoLibrary()
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+    assert [video.video_id for video in library.search_videos("cat")] == [
+        "another_cat_video_id"]
+    library.allow_video("amazing_cats_video_id")
+    assert [video.video_id for video in library.search_videos("cat")] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+
+
+def test_library_tag_search_skips_flagged_videos():
+    library = VideoLibrary()
+    library.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    assert library.search_videos_with_tag("#dog") == []
+    library.allow_video("funny_dogs_video_id")
+    assert [video.video_id for video in library.search_videos_with_tag(
+        "#dog", exact=True)] == ["funny_dogs_video_id"]
+
+
+class _CountingDict(dict):
+    """A dict counting how many values are looked up."""
+
+    lookups = 0
+
+    def __getitem__(self, key):
+        self.lookups += 1
+        return super().__getitem__(key)
+
+
+def test_iter_search_stops_at_the_limit():
+    index = TitleIndex()
+    index.add_all((f"{i:06d}_id", "video") for i in range(10000))
+    index._titles = titles = _CountingDict(index._titles)
+    results = index.iter_search("video")
+    assert next(results) == "000000_id"
+    assert next(results) == "000001_id"
+    assert titles.lookups == 2
+
+    library = VideoLibrary()
+    assert [video.video_id for video in library.search_videos("a", limit=2)] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert [video.video_id for video in library.iter_search_videos_with_tag(
+        "#animal", limit=1)] == ["amazing_cats_video_id"]
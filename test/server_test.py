@@ -0,0 +1,181 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import server
+from src.server import PROMPT, start_server
+from src.video_library import VideoLibrary
+
+
+async def _send(reader, writer, line):
+    writer.write(line.encode() + b"\n")
+    response = await reader.readuntil(PROMPT)
+    return response[:-len(PROMPT)].decode().splitlines()
+
+
+async def _two_sessions(executor=None):
+    server = await start_server(VideoLibrary(), executor=executor)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        first = await asyncio.open_connection("127.0.0.1", port)
+        second = await asyncio.open_connection("127.0.0.1", port)
+        for reader, _ in (first, second):
+            greeting = await reader.readuntil(PROMPT)
+            assert b"Hello and welcome to YouTube" in greeting
+
+        responses = [
+            await _send(*first, "CREATE_PLAYLIST my_playlist"),
+            await _send(*first, "PLAY funny_dogs_video_id"),
+            await _send(*second, "SHOW_ALL_PLAYLISTS"),
+            await _send(*second, "SHOW_PLAYING"),
+            await _send(*second, "FLAG_VIDEO amazing_cats_video_id"),
+            await _send(*first, "PLAY amazing_cats_video_id"),
+            await _send(*first, "PLAY"),
+            await _send(*first, ""),
+        ]
+
+        reader, writer = first
+        writer.write(b"EXIT\n")
+        goodbye = await reader.read()
+        for _, writer in (first, second):
+            writer.close()
+            await writer.wait_closed()
+    return responses, goodbye
+
+
+@pytest.mark.parametrize("threads", [0, 4])
+def test_sessions_keep_their_own_state_and_share_the_library(threads):
+    executor = ThreadPoolExecutor(threads) if threads else None
+    responses, goodbye = asyncio.run(_two_sessions(executor))
+    if executor is not None:
+        executor.shutdown()
+    assert responses[0] == ["Successfully created new playlist: my_playlist"]
+    assert responses[1] == ["Playing video: Funny Dogs"]
+    assert responses[2] == ["No playlists exist yet"]
+    assert responses[3] == ["No video is currently playing"]
+    assert responses[4] == [
+        "Successfully flagged video: Amazing Cats (reason: Not supplied)"]
+    assert responses[5] == [
+        "Cannot play video: Video is currently flagged (reason: Not supplied)"]
+    assert responses[6] == ["Please enter PLAY command followed by video_id."]
+    assert responses[7] == [
+        "Please enter a valid command, type HELP for a list of available "
+        "commands."]
+    assert b"Thank you and goodbye!" in goodbye
+
+
+class _FakeTransport:
+    def __init__(self):
+        self.waiting = 0
+
+    def get_write_buffer_size(self):
+        return self.waiting
+
+
+class _FakeWriter:
+    def __init__(self):
+        self.transport = _FakeTransport()
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+
+def test_event_loop_output_is_cut_short_for_a_slow_client(monkeypatch):
+    monkeypatch.setattr(server, "OUTPUT_CHUNK", 1)
+    writer = _FakeWriter()
+    session = server.Session(VideoLibrary(), server.ConnectionSink(writer))
+    session.execute("SHOW_ALL_VIDEOS")
+    listing = writer.data.decode()
+    assert listing.startswith("Here's a list of all available videos:\n")
+    assert listing.endswith("Video about nothing (nothing_video_id) []\n")
+
+    writer.data = b""
+    writer.transport.waiting = server.MAX_BUFFERED_OUTPUT + 1
+    session.execute("SHOW_ALL_VIDEOS")
+    assert writer.data.decode() == server.TRUNCATED
+
+
+async def _slow_listing(monkeypatch):
+    monkeypatch.setattr(server, "OUTPUT_CHUNK", 16)
+    monkeypatch.setattr(server, "WRITE_BUFFER_HIGH", 64)
+    executor = ThreadPoolExecutor(1)
+    srv = await start_server(VideoLibrary(), executor=executor)
+    port = srv.sockets[0].getsockname()[1]
+    async with srv:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await reader.readuntil(PROMPT)
+        writer.write(b"SHOW_ALL_VIDEOS\n")
+        await asyncio.sleep(0.05)
+        response = await reader.readuntil(PROMPT)
+        writer.write(b"EXIT\n")
+        await reader.read()
+        writer.close()
+        await writer.wait_closed()
+    executor.shutdown()
+    return response[:-len(PROMPT)].decode().splitlines()
+
+
+def test_threaded_output_is_streamed_in_order(monkeypatch):
+    lines = asyncio.run(_slow_listing(monkeypatch))
+    assert lines[0] == "Here's a list of all available videos:"
+    assert lines[-1] == " Video about nothing (nothing_video_id) []"
+    assert len(lines) == 6
+
+
+async def _read_response(reader):
+    response = b""
+    while not response.endswith(PROMPT):
+        chunk = await reader.read(1 << 16)
+        assert chunk
+        response += chunk
+    return response[:-len(PROMPT)].decode()
+
+
+async def _stalled_reader_and_writer(catalog):
+    executor = ThreadPoolExecutor(4)
+    srv = await start_server(VideoLibrary(catalog), executor=executor)
+    port = srv.sockets[0].getsockname()[1]
+    async with srv:
+        clients = [await asyncio.open_connection("127.0.0.1", port)
+                   for _ in range(3)]
+        for reader, _ in clients:
+            await reader.readuntil(PROMPT)
+        (stalled, stalled_writer), flagger, counter = clients
+
+        # The listing is far larger than the socket buffers, and the
+        # client does not read it until the other sessions are done.
+        stalled_writer.write(b"SHOW_ALL_VIDEOS\n")
+        await asyncio.sleep(0.1)
+        flagger[1].write(b"FLAG_VIDEO video_00000001_id\n")
+        await asyncio.sleep(0.1)
+        counter[1].write(b"NUMBER_OF_VIDEOS\n")
+        responses = [
+            await asyncio.wait_for(_read_response(counter[0]), 5),
+            await asyncio.wait_for(_read_response(flagger[0]), 5),
+            await _read_response(stalled),
+        ]
+        for _, writer in clients:
+            writer.write(b"EXIT\n")
+            writer.close()
+    executor.shutdown()
+    return responses
+
+
+def test_client_that_stops_reading_does_not_hold_the_library(
+        monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "DRAIN_TIMEOUT", 0.2)
+    catalog = tmp_path / "videos.txt"
+    with open(catalog, "w") as catalog_file:
+        for i in range(20000):
+            catalog_file.write(f"{'Long title ' * 50}{i} | "
+                               f"video_{i:08d}_id | #tag\n")
+
+    counted, flagged, listing = asyncio.run(
+        _stalled_reader_and_writer(catalog))
+    assert counted == "20000 videos in the library\n"
+    assert flagged.startswith("Successfully flagged video:")
+    assert listing.startswith("Here's a list of all available videos:\n")
+    assert listing.endswith(server.TRUNCATED)
+    assert len(listing) < 20000 * 550
@@ -0,0 +1,120 @@
+import pytest
+
+from src import tag_bitsets
+from src.output_sink import MemorySink
+from src.command_parser import CommandParser
+from src.tag_bitsets import TagBitsets
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture(params=["numpy", "int"])
+def backend(request, monkeypatch):
+    """Runs a test with NumPy bitsets, if installed, and with int ones."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(tag_bitsets, "np", None)
+    return request.param
+
+
+def _bitsets():
+    video_ids = ["a", "b", "c", "d", "e"]
+    tag_names = ["#cat", "#Animal", "#dog", "#animal"]
+    tagged = [(0, [0, 1], False), (1, [2, 3], False), (2, [0, 3], False),
+              (3, [], False), (4, [0], True)]
+    return TagBitsets(video_ids, tag_names, tagged)
+
+
+def test_tag_query_operators(backend):
+    bitsets = _bitsets()
+    assert bitsets.query("#cat") == ["a", "c"]
+    assert bitsets.query("#CAT or #dog") == ["a", "b", "c"]
+    assert bitsets.query("#animal AND NOT #dog") == ["a", "c"]
+    assert bitsets.query("#animal NOT #dog") == ["a", "c"]
+    assert bitsets.query("#animal #cat") == ["a", "c"]
+    assert bitsets.query("NOT #animal") == ["d"]
+    assert bitsets.query("NOT (#cat OR #dog) OR #dog") == ["b", "d"]
+    assert bitsets.query("#cat AND #dog OR #dog") == ["b"]
+    assert bitsets.query("#bird") == []
+    assert bitsets.query("NOT #bird") == ["a", "b", "c", "d"]
+
+
+def test_tag_query_limit(backend, monkeypatch):
+    # Bitsets are scanned a byte at a time for the first matches.
+    monkeypatch.setattr(tag_bitsets, "_SCAN_CHUNK", 1)
+    video_ids = ["video_%02d" % i for i in range(20)]
+    bitsets = TagBitsets(video_ids, ["#even"],
+                         ((i, [0] if i % 2 == 0 else [], False)
+                          for i in range(20)))
+    assert bitsets.query("#even", limit=6) == [
+        "video_00", "video_02", "video_04", "video_06", "video_08",
+        "video_10"]
+    assert bitsets.query("NOT #even", limit=1) == ["video_01"]
+    assert bitsets.query("#even", limit=50) == video_ids[::2]
+
+
+def test_tag_query_skips_flagged_videos(backend):
+    bitsets = _bitsets()
+    bitsets.set_flagged("a", True)
+    bitsets.set_flagged("e", False)
+    bitsets.set_flagged("missing", True)
+    assert bitsets.query("#cat") == ["c", "e"]
+
+
+@pytest.mark.parametrize("query", [
+    "", "#cat AND", "(#cat", "#cat)", "cat", "#cat OR OR #dog", "NOT"])
+def test_malformed_tag_queries_are_rejected(backend, query):
+    with pytest.raises(ValueError):
+        _bitsets().query(query)
+
+
+def test_deep_tag_queries(backend):
+    bitsets = _bitsets()
+    depth = tag_bitsets.MAX_QUERY_DEPTH
+    assert bitsets.query("(" * depth + "#cat" + ")" * depth) == ["a", "c"]
+    with pytest.raises(ValueError, match="nested too deeply"):
+        bitsets.query("(" * 400 + "#cat" + ")" * 400)
+    assert bitsets.query("NOT " * 5000 + "#animal") == ["a", "b", "c"]
+    assert bitsets.query("NOT " * 5001 + "#animal") == ["d"]
+
+
+def test_library_tag_query_follows_the_catalog(backend):
+    library = VideoLibrary()
+    assert [video.video_id for video in library.search_videos_with_tag_query(
+        "#cat AND #animal NOT #dog")] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+    library.add_video(Video("Cat Dog", "cat_dog_video_id", ["#cat", "#dog"]))
+    assert [video.video_id for video in library.search_videos_with_tag_query(
+        "#cat")] == ["another_cat_video_id", "cat_dog_video_id"]
+    assert [video.video_id for video in library.search_videos_with_tag_query(
+        "#cat NOT #dog", limit=1)] == ["another_cat_video_id"]
+
+    library.allow_video("amazing_cats_video_id")
+    library.remove_video("another_cat_video_id")
+    assert [video.video_id for video in library.search_videos_with_tag_query(
+        "#cat NOT #dog")] == ["amazing_cats_video_id"]
+
+
+def test_search_videos_with_tags_command(backend):
+    output = MemorySink()
+    parser = CommandParser(VideoPlayer(interactive=False, output=output))
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAGS", "#animal", "NOT",
+                            "(#cat", "OR", "#google)"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAGS", "#dog", "AND"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAGS", "#career", "#dog"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAGS"] + ["("] * 400
+                           + ["#cat"] + [")"] * 400)
+    assert output.lines() == [
+        "Here are the results for #animal NOT (#cat OR #google):",
+        " 1) Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "Would you like to play any of the above? If yes, specify the number of the video.",
+        "If your answer is not a valid number, we will assume it's a no.",
+        "Cannot search for #dog AND: the query ends too early",
+        "No search results for #career #dog",
+        "Cannot search for " + " ".join(["("] * 400 + ["#cat"] + [")"] * 400)
+        + ": query nested too deeply",
+    ]
@@ -1,4 +1,10 @@
+import random
+
 from src.video_library import VideoLibrary
+from src.video import Video
+from src.video_pool import VideoPool
+from src.video_player import VideoPlayer
+from src.output_sink import MemorySink
 
 
 def test_library_has_all_videos():
@@ -24,3 +30,121 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_sorted_orderings_are_maintained():
+    library = VideoLibrary()
+    assert [video.video_id for video in library.get_videos_sorted_by_id()] == [
+        "amazing_cats_video_id", "another_cat_video_id", "funny_dogs_video_id",
+        "life_at_google_video_id", "nothing_video_id"]
+
+    removed = library.remove_video("another_cat_video_id")
+    library.add_video(Video("A Cat Video", "zzz_cat_video_id", ["#cat"]))
+    assert removed.title == "Another Cat Video"
+    assert len(library) == 5
+    assert [video.title for video in library.get_videos_sorted_by_title()] == [
+        "A Cat Video", "Amazing Cats", "Funny Dogs", "Life at Google",
+        "Video about nothing"]
+    assert [video.video_id for video in library.search_videos("cat")] == [
+        "amazing_cats_video_id", "zzz_cat_video_id"]
+
+
+def test_tags_are_stored_once_as_integer_ids():
+    library = VideoLibrary()
+    cats = library.get_video("amazing_cats_video_id")
+    dogs = library.get_video("funny_dogs_video_id")
+
+    assert cats.tag_ids[1] == dogs.tag_ids[1]
+    assert cats.tags[1] is dogs.tags[1] == "#animal"
+
+
+def test_listing_line_follows_flag_changes():
+    library = VideoLibrary()
+    video = library.get_video("funny_dogs_video_id")
+    assert video.display_line == "Funny Dogs (funny_dogs_video_id) [#dog #animal]"
+    assert video.listing_line == video.display_line
+
+    library.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    assert video.listing_line == (
+        "Funny Dogs (funny_dogs_video_id) [#dog #animal] - FLAGGED "
+        "(reason: dont_like_dogs)")
+
+    library.allow_video("funny_dogs_video_id")
+    library.flag_video("funny_dogs_video_id", "still_dont_like_dogs")
+    assert video.listing_line.endswith("(reason: still_dont_like_dogs)")
+    library.allow_video("funny_dogs_video_id")
+    assert video.listing_line == video.display_line
+
+
+def test_players_share_library_with_separate_playback():
+    library = VideoLibrary()
+    outputs = [MemorySink() for _ in range(100)]
+    players = [VideoPlayer(library, output=output) for output in outputs]
+    players[0].play_video("amazing_cats_video_id")
+    players[0].pause_video()
+    players[1].play_video("funny_dogs_video_id")
+    players[2].flag_video("nothing_video_id", "dont_like")
+    for player in players:
+        player.show_playing()
+
+    assert outputs[0].lines()[-1].endswith("[#cat #animal] - PAUSED")
+    assert outputs[1].lines()[-1] == (
+        "Currently playing: Funny Dogs (funny_dogs_video_id) [#dog #animal]")
+    assert outputs[99].lines() == ["No video is currently playing"]
+    assert library.get_video("nothing_video_id").reason == "dont_like"
+
+
+def test_removed_video_keeps_its_flag():
+    library = VideoLibrary()
+    library.flag_video("funny_dogs_video_id", "dont_like")
+    removed = library.remove_video("funny_dogs_video_id")
+    library.add_video(removed)
+
+    assert removed.reason == "dont_like"
+    assert library.get_video("funny_dogs_video_id").flagged
+    assert "funny_dogs_video_id" not in [
+        video.video_id for video in library.search_videos("dog")]
+
+
+def test_video_pool_swaps_removed_ids_out():
+    pool = VideoPool(["a", "b", "c"])
+    pool.remove("a")
+    pool.remove("missing")
+    pool.add("b")
+    pool.add("d")
+    assert len(pool) == 3
+    assert "a" not in pool
+    assert {pool.choice(random.Random(seed)) for seed in range(50)} == {
+        "b", "c", "d"}
+    for video_id in ("b", "c", "d"):
+        pool.remove(video_id)
+    assert pool.choice(random.Random(0)) is None
+
+
+def test_random_video_skips_flagged_and_removed_videos():
+    library = VideoLibrary()
+    rng = random.Random(0)
+    assert library.get_random_video(rng) is not None
+
+    library.flag_video("funny_dogs_video_id", "dont_like")
+    library.remove_video("amazing_cats_video_id")
+    library.add_video(Video("Funny Cats", "funny_cats_video_id", ["#cat"]))
+    picked = {library.get_random_video(rng).video_id for _ in range(200)}
+    assert picked == {"another_cat_video_id", "life_at_google_video_id",
+                      "nothing_video_id", "funny_cats_video_id"}
+
+    for video_id in picked:
+        library.flag_video(video_id, "dont_like")
+    assert library.get_random_video(rng) is None
+    library.allow_video("funny_dogs_video_id")
+    assert library.get_random_video(rng).video_id == "funny_dogs_video_id"
+
+
+def test_seeded_players_play_the_same_random_videos():
+    library = VideoLibrary()
+    outputs = [MemorySink(), MemorySink()]
+    for output in outputs:
+        player = VideoPlayer(library, output=output, rng=random.Random(7))
+        for _ in range(10):
+            player.play_random_video()
+    assert outputs[0].lines() == outputs[1].lines()